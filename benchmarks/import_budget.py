@@ -0,0 +1,99 @@
+"""
+Import-time budget check for the modules the command line tools start from.
+
+Each module is imported in a fresh interpreter under `python -X importtime`, from
+an empty scratch directory, so the check also catches modules that touch the
+filesystem on import. A module fails if its cumulative import time exceeds its
+budget, if it pulls in one of the heavy dependencies that should only load on
+first use, or if importing it leaves files behind.
+
+Run from the repository root:
+
+    python -m benchmarks.import_budget
+
+or as part of the tests with BUNPRO_IMPORT_BUDGET=1 set; timings depend on the
+machine, so the check is not part of the default test run.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# Cumulative import time allowed per module, in milliseconds
+BUDGETS_MS = {
+    "dictionary_construction.create_dictionary": 100,
+    "dictionary_construction.dataframe_generator": 100,
+    "dictionary_construction.intermediate": 50,
+    "scraper.bunpro": 100,
+}
+HEAVY_MODULES = {"pandas", "numpy", "bs4", "lxml", "requests", "tqdm", "pyarrow"}
+
+
+def import_profile(module, cwd) -> dict:
+    """
+    Imports module in a new interpreter and returns {imported module: cumulative µs}.
+    Raises ImportError with the last line of the traceback if the import fails.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.getcwd()] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def check_module(module, budget_ms, repeat=3) -> list:
+    """Returns a list of problems found when importing module."""
+    problems = []
+    cumulative = []
+    with tempfile.TemporaryDirectory() as cwd:
+        try:
+            for _ in range(repeat):
+                timings = import_profile(module, cwd)
+                cumulative.append(timings[module])
+        except ImportError as e:
+            print(f"{module:<45} failed")
+            return [f"{module} cannot be imported from another directory: {e}"]
+        heavy = sorted(HEAVY_MODULES & set(timings))
+        leftovers = os.listdir(cwd)
+    milliseconds = min(cumulative) / 1000
+    print(f"{module:<45} {milliseconds:7.1f} ms (budget {budget_ms} ms)")
+    if milliseconds > budget_ms:
+        problems.append(f"{module} took {milliseconds:.1f} ms to import")
+    if heavy:
+        problems.append(f"{module} imports {', '.join(heavy)} eagerly")
+    if leftovers:
+        problems.append(f"importing {module} created {', '.join(leftovers)}")
+    return problems
+
+
+def main(budgets=BUDGETS_MS, repeat=3) -> list:
+    problems = []
+    for module, budget_ms in budgets.items():
+        problems += check_module(module, budget_ms, repeat)
+    for problem in problems:
+        print(f"FAIL {problem}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check module import times.")
+    parser.add_argument("--repeat", type=int, default=3, help="Imports per module; the fastest counts.")
+    args = parser.parse_args()
+    sys.exit(1 if main(repeat=args.repeat) else 0)
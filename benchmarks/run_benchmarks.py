@@ -0,0 +1,234 @@
+"""
+Benchmark suite for the dictionary build pipeline.
+
+Runs Dictionary_Entry, generate_entry, dataframe_generator.main,
+json_generator.main and zip_directory against a fixed sample of the checked-in
+grammar_pages and against synthetic corpora made of that sample repeated 1x, 10x
+and 100x. Each run is appended to benchmarks/results.json and compared with the
+previous run from the same machine; benchmarks slower by more than --threshold
+are reported as regressions. results.json is machine-specific and not tracked;
+the first run on a checkout starts a fresh history.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks [--scales 1 10] [--repeat 3]
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from bs4 import BeautifulSoup
+# Loaded lazily by dataframe_generator; imported here so the first timed run
+# does not pay for it
+import pandas  # noqa: F401
+from dictionary_construction import dataframe_generator, json_generator
+from dictionary_construction.create_dictionary import zip_directory
+from dictionary_construction.extraction import generate_entry
+from dictionary_construction.Entry import Dictionary_Entry
+
+SOURCE_DIR = "grammar_pages"
+SAMPLE_SIZE = 10
+SCALES = [1, 10, 100]
+RESULTS_PATH = os.path.join("benchmarks", "results.json")
+REGRESSION_THRESHOLD = 1.2
+# Differences smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.01
+
+
+def sample_pages(source_dir=SOURCE_DIR, size=SAMPLE_SIZE) -> list:
+    """
+    Picks an evenly spaced, deterministic sample of the saved pages. The largest
+    page is always included since it is the known worst case.
+    """
+    pages = sorted(page for page in os.listdir(source_dir) if page.endswith(".html"))
+    largest = max(pages, key=lambda page: os.path.getsize(os.path.join(source_dir, page)))
+    sample = pages[:: max(len(pages) // (size - 1), 1)][: size - 1]
+    if largest not in sample:
+        sample.append(largest)
+    return sample
+
+
+def build_corpus(pages, scale, source_dir, corpus_dir):
+    """
+    Fills corpus_dir with `scale` copies of every sample page. Copies are hard links
+    where possible, so even the 100x corpus takes no extra disk space.
+    """
+    os.makedirs(corpus_dir)
+    for copy in range(scale):
+        for page in pages:
+            source = os.path.join(source_dir, page)
+            target = os.path.join(corpus_dir, f"{copy:03d}_{page}")
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copyfile(source, target)
+
+
+def read_corpus(corpus_dir) -> list:
+    htmls = []
+    for page in sorted(os.listdir(corpus_dir)):
+        with open(os.path.join(corpus_dir, page), "r", encoding="utf-8") as f:
+            htmls.append(f.read())
+    return htmls
+
+
+def time_call(function, repeat) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_scale(pages, scale, source_dir, repeat) -> dict:
+    """
+    Runs every benchmark on one corpus size inside a scratch directory laid out like
+    the repository (grammar_pages/, dictionary_files/). Returns timings by name.
+    """
+    results = {}
+    cwd = os.getcwd()
+    source_dir = os.path.abspath(source_dir)
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_dir = os.path.join(workdir, "grammar_pages")
+        build_corpus(pages, scale, source_dir, corpus_dir)
+        os.makedirs(os.path.join(workdir, "dictionary_files"))
+        # json_generator.main writes to dictionary_files relative to the cwd
+        os.chdir(workdir)
+        try:
+            htmls = read_corpus(corpus_dir)
+            entries = []
+
+            def parse_entries():
+                entries[:] = [
+                    Dictionary_Entry(BeautifulSoup(html, "html.parser")).to_record()
+                    for html in htmls
+                ]
+
+            csv_path = os.path.join(workdir, "bunpro_entries.csv")
+            benchmarks = {
+                "Dictionary_Entry": parse_entries,
+                "generate_entry": lambda: [generate_entry(entry) for entry in entries],
+                "dataframe_generator.main": lambda: dataframe_generator.main(
+                    output=csv_path, pages_dir=corpus_dir
+                ),
+                "json_generator.main": lambda: json_generator.main(path=csv_path),
+                "zip_directory": lambda: zip_directory(
+                    "dictionary_files", os.path.join(workdir, "bunpro_dict.zip")
+                ),
+            }
+            # Later benchmarks consume the output of earlier ones, so order matters
+            for name, function in benchmarks.items():
+                timings = time_call(function, repeat)
+                results[name] = {
+                    "min": min(timings),
+                    "median": statistics.median(timings),
+                    "pages": len(htmls),
+                }
+                print(
+                    f"{scale:>4}x {name:<26} min {results[name]['min']:8.3f}s "
+                    f"median {results[name]['median']:8.3f}s"
+                )
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_results(path=RESULTS_PATH) -> list:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def find_regressions(previous, current, threshold=REGRESSION_THRESHOLD) -> list:
+    """
+    Compares the min timings of two runs; returns (benchmark, old, new) for every
+    benchmark that got slower by more than threshold.
+    """
+    regressions = []
+    for key, timing in current["results"].items():
+        old = previous["results"].get(key)
+        if (
+            old
+            and timing["min"] > old["min"] * threshold
+            and timing["min"] - old["min"] > MIN_REGRESSION_SECONDS
+        ):
+            regressions.append((key, old["min"], timing["min"]))
+    return regressions
+
+
+def main(scales=SCALES, repeat=3, source_dir=SOURCE_DIR, threshold=REGRESSION_THRESHOLD, save=True):
+    pages = sample_pages(source_dir)
+    run = {
+        "commit": current_commit(),
+        "date": dt.datetime.now().isoformat(timespec="seconds"),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "sample": pages,
+        "repeat": repeat,
+        "results": {},
+    }
+    for scale in scales:
+        for name, timing in run_scale(pages, scale, source_dir, repeat).items():
+            run["results"][f"{name}@{scale}x"] = timing
+
+    history = load_results()
+    previous = next(
+        (old for old in reversed(history) if old["machine"] == run["machine"]), None
+    )
+    regressions = find_regressions(previous, run, threshold) if previous else []
+    for key, old, new in regressions:
+        print(f"REGRESSION {key}: {old:.3f}s -> {new:.3f}s (since {previous['commit']})")
+
+    if save:
+        history.append(run)
+        with open(RESULTS_PATH, "w", encoding="utf-8") as f:
+            json.dump(history, f, ensure_ascii=False, indent=4)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the dictionary build.")
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=SCALES,
+        help="Corpus sizes to run, as multiples of the sample.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="Flag benchmarks whose min time grew by more than this factor.",
+    )
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="Do not append this run to benchmarks/results.json.",
+    )
+    args = parser.parse_args()
+    regressions = main(args.scales, args.repeat, threshold=args.threshold, save=not args.no_save)
+    sys.exit(1 if regressions else 0)
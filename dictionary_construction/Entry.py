@@ -1,75 +1,158 @@
-import re
-from bs4 import BeautifulSoup
-from dictionary_construction.const import FIX_POS
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from dictionary_construction.const import (
+    CANONICAL_LINK_SELECTOR,
+    DEFINITION_SELECTOR,
+    EN_EXAMPLE_SELECTOR,
+    EXAMPLE_SECTION_CLASSES,
+    FIX_POS,
+    JLPT_LEVELS,
+    LATIN_CHARS,
+    NON_LATIN_PREFIX,
+    POS_LABEL_SELECTOR,
+    POS_TITLE,
+    POS_TITLE_SELECTOR,
+    STUDY_QUESTION_ID,
+    WHITESPACE_RUN,
+    WRITEUP_CLASS,
+)
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+@dataclass(frozen=True, slots=True)
+class Entry_Record:
+    """
+    Immutable result of extracting one page.
+
+    Holds only the extracted fields, so collecting records (in a batch, cache or
+    pool) does not keep the parsed page alive the way Dictionary_Entry does.
+    """
+    subject: str
+    reading: str
+    term_long_name: str
+    part_of_speech: str
+    definition: str
+    explanation: str
+    example_sentences: tuple
+    link: str
+    matchup: int
+    JLPT: str
+
 
 class Dictionary_Entry:
-    def __init__(self, BS4_soup: BeautifulSoup):
+    """
+    Extracts the dictionary fields from a page's soup.
+
+    The extractor keeps the soup and mutates it (extract_explanation removes the
+    example sections), so it should be discarded once to_record has been called.
+    With populate=False only the title is read and populate() is left to the caller,
+    e.g. so parsing and extraction can be timed separately.
+    """
+
+    def __init__(self, BS4_soup: "BeautifulSoup", populate=True):
         self.soup = BS4_soup
+        self.title = self.soup.find("title").get_text(strip=True)
+        if populate:
+            self.populate()
+
+    def populate(self):
         self.subject = self.extract_subject()
         self.reading = ''
-        self.term_long_name = self.soup.find("title").get_text(strip=True).split(" ")[0]
+        self.term_long_name = self.title.split(" ")[0]
         self.part_of_speech = self.extract_pos()
-        self.definition = self.soup.select_one("p.line-clamp-1").get_text(strip=True)
+        self.definition = self.extract_definition()
         self.explanation = self.extract_explanation()
         self.example_sentences = self.extract_jp_example()
-        self.link = self.soup.select_one('head > link[rel="canonical"]')['href']
+        self.link = self.extract_link()
         self.matchup = 10
         self.JLPT = self.extract_jlpt_level()
 
+    def to_record(self) -> Entry_Record:
+        return Entry_Record(
+            subject=self.subject,
+            reading=self.reading,
+            term_long_name=self.term_long_name,
+            part_of_speech=self.part_of_speech,
+            definition=self.definition,
+            explanation=self.explanation,
+            example_sentences=tuple(self.example_sentences),
+            link=self.link,
+            matchup=self.matchup,
+            JLPT=self.JLPT,
+        )
+
     def extract_subject(self):
-        result = self.soup.find("h1").get_text(strip=True).split(" ")[0]
-        return re.sub(r"[a-zA-Z,]", "", result)
+        return self.clean_subject(self.soup.find("h1").get_text(strip=True))
+
+    @staticmethod
+    def clean_subject(heading: str) -> str:
+        result = heading.split(" ")[0]
+        return LATIN_CHARS.sub("", result)
 
     def extract_pos(self):
-        title = self.soup.select("ul h4")
-        labels = self.soup.select("ul > li > p")
+        title = [t.get_text(strip=True) for t in self.soup.select(POS_TITLE_SELECTOR)]
+        labels = [l.get_text(strip=True) for l in self.soup.select(POS_LABEL_SELECTOR)]
+        return self.lookup_pos(title, labels)
+
+    @staticmethod
+    def lookup_pos(title: list, labels: list) -> str:
         for t, l in zip(title, labels):
-            if t.get_text(strip=True) == "Part of Speech":
-                result = l.get_text(strip=True)
-                result = FIX_POS.get(result)
+            if t == POS_TITLE:
+                result = FIX_POS.get(l)
                 if result:
                     return result
                 else:
                     raise ValueError(f"Unknown POS: {result}")
         return ""
 
+    def extract_definition(self) -> str:
+        return self.soup.select_one(DEFINITION_SELECTOR).get_text(strip=True)
+
     def extract_explanation(self) -> str:
-        main_div = self.soup.find("div", class_="bp-ddw bp-writeup-body prose")
+        main_div = self.soup.find("div", class_=WRITEUP_CLASS)
 
         try:
-            for example_section in main_div.find_all(
-                class_=["writeup-example--japanese", "writeup-example--english"]
-            ):
+            for example_section in main_div.find_all(class_=EXAMPLE_SECTION_CLASSES):
                 example_section.decompose()
             explination = main_div.get_text(separator=" ", strip=True)
             return explination
         except AttributeError:
-            print(
-                f"Could not find example sections in {self.soup.find('title').get_text(strip=True)}"
-            )
+            print(f"Could not find example sections in {self.title}")
             return "Error: Could not extract explanation"
         
     def extract_jp_example(self) -> list:
-        example_sentences = self.soup.find_all(id=re.compile(r'^study-question-\d+$'))
+        example_sentences = self.soup.find_all(id=STUDY_QUESTION_ID)
         result = []
         for sentance in example_sentences:
             jp_text = sentance.get_text(strip=True)
-            try:
-                jp_text = re.match(r'^[^A-Za-z]+', jp_text).group()
-            except AttributeError:
-                pass
-
-            en_text = sentance.select_one('p.bp-sdw.undefined').get_text(strip=False).replace('\n', ' ')
-            en_text = re.sub(r'\s+', ' ', en_text)
-            result.append((jp_text+'\n'+en_text))
+            en_text = sentance.select_one(EN_EXAMPLE_SELECTOR).get_text(strip=False)
+            result.append(self.format_example(jp_text, en_text))
         return result
 
+    @staticmethod
+    def format_example(jp_text: str, en_text: str) -> str:
+        try:
+            jp_text = NON_LATIN_PREFIX.match(jp_text).group()
+        except AttributeError:
+            pass
+
+        en_text = en_text.replace('\n', ' ')
+        en_text = WHITESPACE_RUN.sub(' ', en_text)
+        return jp_text+'\n'+en_text
+
+    def extract_link(self) -> str:
+        return self.soup.select_one(CANONICAL_LINK_SELECTOR)['href']
 
     def extract_jlpt_level(self) -> str:
-        title = self.soup.find("title").get_text(strip=True)
+        return self.parse_jlpt(self.title)
+
+    @staticmethod
+    def parse_jlpt(title: str) -> str:
         # Extract the JLPT level from the title
         jlpt = title.split("JLPT")[1].strip(") | Bunpro")
-        if jlpt not in ["N5", "N4", "N3", "N2", "N1", "N0"]:
+        if jlpt not in JLPT_LEVELS:
             raise ValueError(f"Unknown JLPT level: {jlpt}")
         return jlpt
     
@@ -1,5 +1,4 @@
-from bs4 import BeautifulSoup
-import os
+import re
 
 # path_to_json = r"grammar_pages"
 # pages_list = os.listdir(path_to_json)
@@ -52,3 +51,36 @@ FIX_POS = {
     "Pronoun": "pn",
     "Verb": "v-unspec",
 }
+
+# Bump whenever Dictionary_Entry or generate_entry change their output so that
+# cached records from older builds are no longer reused.
+EXTRACTOR_VERSION = 1
+
+# Positions of the fields in a term bank entry, see generate_entry
+SUBJECT, READING, POS, JLPT = 0, 1, 3, 7
+
+# Extraction rules shared by Entry.py, lxml_entry.py and dataframe_generator.py.
+# Patterns are compiled once at import instead of on every page or sentence.
+LATIN_CHARS = re.compile(r"[a-zA-Z,]")
+STUDY_QUESTION_ID = re.compile(r"^study-question-\d+$")
+NON_LATIN_PREFIX = re.compile(r"^[^A-Za-z]+")
+WHITESPACE_RUN = re.compile(r"\s+")
+
+# The lxml backend matches the tags and classes directly; the bs4 backend uses
+# the CSS selectors built from them.
+POS_LIST_TAG = "ul"
+POS_TITLE_TAG = "h4"
+POS_LABEL_PATH = ("ul", "li", "p")
+POS_TITLE = "Part of Speech"
+DEFINITION_CLASS = "line-clamp-1"
+WRITEUP_CLASS = "bp-ddw bp-writeup-body prose"
+EXAMPLE_SECTION_CLASSES = ["writeup-example--japanese", "writeup-example--english"]
+EN_EXAMPLE_CLASSES = {"bp-sdw", "undefined"}
+CANONICAL_REL = "canonical"
+
+POS_TITLE_SELECTOR = f"{POS_LIST_TAG} {POS_TITLE_TAG}"
+POS_LABEL_SELECTOR = " > ".join(POS_LABEL_PATH)
+DEFINITION_SELECTOR = f"p.{DEFINITION_CLASS}"
+EN_EXAMPLE_SELECTOR = "p" + "".join(f".{token}" for token in sorted(EN_EXAMPLE_CLASSES))
+CANONICAL_LINK_SELECTOR = f'head > link[rel="{CANONICAL_REL}"]'
+JLPT_LEVELS = {"N5", "N4", "N3", "N2", "N1", "N0"}
@@ -1,65 +1,34 @@
-import json
+import argparse
+import itertools
 import os
-from bs4 import BeautifulSoup
+from contextlib import nullcontext
 import zipfile
-from dictionary_construction.Entry import Dictionary_Entry
+from dictionary_construction.dictionary_metadata import (
+    DictionaryMetadata,
+    write_index,
+    write_metadata_banks,
+)
+from dictionary_construction.extraction import (
+    generate_entry,
+    list_pages,
+    parse_entry,
+    read_page,
+    read_pages,
+)
+from dictionary_construction.extraction_cache import ExtractionCache
+from dictionary_construction.pipeline import run_pipeline
+from dictionary_construction.profiling import BuildProfiler, run_with_cprofile
+from dictionary_construction.term_bank_writer import (
+    DEFAULT_MAX_BYTES,
+    TermBankWriter,
+    ZipTermBankWriter,
+    staged_directory,
+    staged_file,
+)
 
-def generate_entry(entry: Dictionary_Entry) -> list:
-    """
-    Generates a dictionary structure for the desired JSON schema with dynamic example sentences.
-    """
-    # Create the list of example sentence structures dynamically
-    example_sentence_list = [
-        {
-            "tag": "li",
-            "style": {"listStyleType": f"'{chr(9311 + idx)}'"},
-            "content": sentence
-        }
-        for idx, sentence in enumerate(entry.example_sentences, start=1)
-    ]
-    
-    # JSON structure based on provided schema
-    data = [
-        entry.subject,
-        entry.reading,
-        entry.term_long_name,
-        entry.part_of_speech,
-        0,
-        [
-            {
-                "type": "structured-content",
-                "content": [
-                    "【 Meaning 】",
-                    {"tag": "div", "style": {"marginLeft": 1}, "content": entry.definition},
-                    "【 Explanation 】",
-                    {"tag": "div", "style": {"marginLeft": 1}, "content": entry.explanation},
-                    "【 Example sentences 】",
-                    {
-                        "tag": "ol",
-                        "content": example_sentence_list,
-                    },
-                ],
-            },
-            {
-                "type": "structured-content",
-                "content": [
-                    {
-                        "tag": "a",
-                        "href": entry.link,
-                        "content": "Link to Bunpro",
-                    }
-                ]
-            }
-        ],
-        1,
-        entry.JLPT,
-    ]
-    return data
-
-
-def zip_directory(directory_path, zip_name):
+def zip_directory(directory_path, zip_name, compresslevel=None):
     # Create a ZipFile object
-    with zipfile.ZipFile(zip_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
+    with zipfile.ZipFile(zip_name, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
         # Walk through all files and folders within the directory
         for root, _, files in os.walk(directory_path):
             for file in files:
@@ -68,23 +37,349 @@ def zip_directory(directory_path, zip_name):
                 # Write the file into the zip archive with a relative path
                 zipf.write(full_path, os.path.relpath(full_path, directory_path))
 
-def main():
+def _peak_rss(path_to_html_files, limit, backend, keep_soup) -> int:
+    # Runs in a fresh process so each variant starts from the same baseline
+    import resource
+
+    kept = []
+    for _, html in itertools.islice(read_pages(path_to_html_files), limit):
+        entry = parse_entry(html, backend)
+        kept.append(entry if keep_soup else entry.to_record())
+        del entry
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def memory_benchmark(path_to_html_files, limit=None, backend="bs4") -> dict:
+    """
+    Compares the peak RSS of holding `limit` pages as Dictionary_Entry objects (which
+    keep their parse trees) against holding them as Entry_Records.
+
+    Each variant runs in its own spawned process. Returns peak RSS in MB per variant.
+    """
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for name, keep_soup in (("Dictionary_Entry", True), ("Entry_Record", False)):
+            peak = pool.apply(_peak_rss, (path_to_html_files, limit, backend, keep_soup))
+            results[name] = peak / 1024
+            print(f"{name}: peak RSS {results[name]:.1f} MB")
+    return results
+
+
+# Stages timed by the profiler, in Dictionary_Entry.populate order
+EXTRACT_METHODS = [
+    "extract_subject",
+    "extract_pos",
+    "extract_definition",
+    "extract_explanation",
+    "extract_jp_example",
+    "extract_link",
+    "extract_jlpt_level",
+]
+
+
+def profile_record(page, html: str, profiler, backend="bs4") -> list:
+    """
+    extract_record with the parse, each extract_* method and generate_entry timed
+    as separate stages of page.
+    """
+    with profiler.stage("parse", page):
+        entry = parse_entry(html, backend, populate=False)
+    profiler.time_methods(entry, EXTRACT_METHODS, page)
+    entry.populate()
+    with profiler.stage("generate_entry", page):
+        return generate_entry(entry.to_record())
+
+
+def profile_records(path_to_html_files, profiler, backend="bs4"):
+    """
+    Yields a record for every page in page order, serially and without the cache,
+    so that every page is measured.
+    """
+    for page in list_pages(path_to_html_files):
+        with profiler.stage("read", page):
+            html = read_page(path_to_html_files, page)
+        yield profile_record(page, html, profiler, backend)
+
+
+def field_benchmark(path_to_html_files, backend="bs4") -> dict:
+    """
+    Times parsing and each extract_* method separately across every saved page.
+    """
+    with BuildProfiler() as profiler:
+        for _ in profile_records(path_to_html_files, profiler, backend):
+            pass
+    profiler.print_summary()
+    return profiler.report()
+
+
+def write_term_banks(
+    grammar_points, directory, max_entries=None, max_bytes=DEFAULT_MAX_BYTES, indent=4
+) -> int:
+    """
+    Streams records into term_bank_{n}.json shards, then writes the tag bank, the
+    JLPT frequency bank and index.json gathered on the way. Returns the number of
+    term bank shards.
+
+    The files are built in a staging directory and only replace the previous
+    build once every record has been written, so a failed build leaves it intact.
+    """
+    metadata = DictionaryMetadata()
+    with staged_directory(directory) as staging:
+        with TermBankWriter(staging, max_entries, max_bytes, indent) as writer:
+            writer.write_all(metadata.track(grammar_points))
+        index_json = write_metadata_banks(
+            metadata,
+            lambda prefix: TermBankWriter(staging, max_entries, max_bytes, indent, prefix),
+            writer.digest,
+        )
+        write_index(staging, index_json)
+    return writer.shard_count
+
+
+def package_dictionary(
+    grammar_points,
+    zip_name,
+    max_entries=None,
+    max_bytes=DEFAULT_MAX_BYTES,
+    indent=4,
+    compresslevel=None,
+    parallel=False,
+) -> int:
+    """
+    Writes the term bank shards, the tag and frequency banks and index.json straight
+    into zip_name without staging them in dictionary_files. Returns the number of
+    term bank shards.
+
+    The archive is written to a temporary file that only replaces zip_name once
+    it is complete, so a failed build keeps the previous zip.
+    """
+    metadata = DictionaryMetadata()
+    with staged_file(zip_name) as staging, zipfile.ZipFile(
+        staging, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+    ) as zipf:
+
+        def open_writer(prefix):
+            return ZipTermBankWriter(
+                zipf,
+                parallel=parallel,
+                max_entries=max_entries,
+                max_bytes=max_bytes,
+                indent=indent,
+                prefix=prefix,
+            )
+
+        with open_writer("term_bank") as writer:
+            writer.write_all(metadata.track(grammar_points))
+        index_json = write_metadata_banks(metadata, open_writer, writer.digest)
+        zipf.writestr("index.json", index_json)
+    return writer.shard_count
+
+
+def main(
+    workers=1,
+    cache_path="extraction_cache.sqlite",
+    backend="bs4",
+    max_entries=None,
+    max_bytes=DEFAULT_MAX_BYTES,
+    indent=4,
+    zip_name=None,
+    compresslevel=None,
+    parallel_compression=False,
+    page_store_path=None,
+    profiler=None,
+    prefetch=32,
+):
+    """
+    Builds the term banks into dictionary_files, or straight into zip_name when given.
+    Pages are read from grammar_pages, or from the PageStore at page_store_path.
+
+    Pages are read ahead on a background thread (up to prefetch of them) and the
+    term banks are written on another while parsing continues. With a BuildProfiler
+    the build instead runs serially without the cache and records every stage of
+    every page.
+    """
     path_to_html_files = r"grammar_pages"
-    page_list = os.listdir(path_to_html_files)
-    grammar_points = []
+    if page_store_path:
+        from scraper.page_store import PageStore
 
-    for page in page_list:
-        with open(os.path.join(path_to_html_files, page), "r", encoding="utf-8") as f:
-            soup = BeautifulSoup(f, "html.parser", from_encoding="utf-8")
+        path_to_html_files = PageStore(page_store_path)
+    output_directory = r"dictionary_files"
 
-        entry = Dictionary_Entry(soup)
-        entry = generate_entry(entry)
-        grammar_points.append(entry)
+    def emit(grammar_points):
+        if zip_name:
+            package_dictionary(
+                grammar_points,
+                zip_name,
+                max_entries,
+                max_bytes,
+                indent,
+                compresslevel,
+                parallel_compression,
+            )
+        else:
+            write_term_banks(grammar_points, output_directory, max_entries, max_bytes, indent)
 
-    for i in range(4):
-        with open(fr"dictionary_files\term_bank_{i+1}.json", "w", encoding="utf-8") as f:
-            json.dump(grammar_points[i::4], f, indent=4, ensure_ascii=False)
+    if profiler is not None:
+        grammar_points = list(profile_records(path_to_html_files, profiler, backend))
+        with profiler.stage("package_dictionary" if zip_name else "write_term_banks"):
+            emit(grammar_points)
+    else:
+        if cache_path:
+            with ExtractionCache(cache_path) as cache:
+                run_pipeline(path_to_html_files, emit, workers, cache, backend, prefetch)
+        else:
+            run_pipeline(path_to_html_files, emit, workers, backend=backend, prefetch=prefetch)
+    if page_store_path:
+        path_to_html_files.close()
 
 if __name__ == "__main__":
-    main()
-    zip_directory("dictionary_files", "bunpro_dict.zip")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the Bunpro term banks.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to parse pages (0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--cache",
+        default="extraction_cache.sqlite",
+        help="SQLite file used to reuse records for unchanged pages.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every page, ignoring and not updating the cache.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["bs4", "lxml"],
+        default="bs4",
+        help="HTML parser used for extraction; lxml is faster and produces the same entries.",
+    )
+    parser.add_argument(
+        "--max-bank-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help="Start a new term bank once the current one would exceed this many bytes.",
+    )
+    parser.add_argument(
+        "--max-bank-entries",
+        type=int,
+        default=None,
+        help="Start a new term bank once the current one holds this many entries.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help=(
+            "Write term banks without indentation. Only compact banks are encoded "
+            "with orjson (the 'fast' extra); indented banks always use json."
+        ),
+    )
+    parser.add_argument(
+        "--zip-direct",
+        action="store_true",
+        help="Write index.json and the term banks straight into bunpro_dict.zip.",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        default=None,
+        help="Deflate level (0-9) used for bunpro_dict.zip.",
+    )
+    parser.add_argument(
+        "--parallel-compression",
+        action="store_true",
+        help="With --zip-direct, compress finished shards on a background thread.",
+    )
+    parser.add_argument(
+        "--page-store",
+        default=None,
+        help="Read pages from this PageStore file instead of grammar_pages.",
+    )
+    parser.add_argument(
+        "--field-benchmark",
+        action="store_true",
+        help="Time parsing and each extract_* method across all pages, then exit.",
+    )
+    parser.add_argument(
+        "--memory-benchmark",
+        type=int,
+        metavar="N",
+        default=None,
+        help="Report peak RSS of holding N parsed pages as entries vs records, then exit.",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=32,
+        help="Number of pages read ahead of the parser.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="build_profile.json",
+        default=None,
+        metavar="REPORT",
+        help="Time every build stage per page (serially, without the cache) and write a JSON report.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of slowest pages listed by --profile.",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="With --profile, also record allocations per stage using tracemalloc.",
+    )
+    parser.add_argument(
+        "--cprofile",
+        default=None,
+        metavar="STATS",
+        help="Run the build under cProfile and save the stats to this file.",
+    )
+    args = parser.parse_args()
+    if args.field_benchmark:
+        field_benchmark(r"grammar_pages", args.backend)
+        raise SystemExit
+    if args.memory_benchmark is not None:
+        memory_benchmark(r"grammar_pages", args.memory_benchmark or None, args.backend)
+        raise SystemExit
+    profiler = BuildProfiler(args.trace_memory, args.top) if args.profile else None
+
+    def build():
+        if profiler is not None:
+            profiler.start()
+        main(
+            workers=args.workers or None,
+            cache_path=None if args.no_cache else args.cache,
+            backend=args.backend,
+            max_entries=args.max_bank_entries,
+            max_bytes=args.max_bank_bytes,
+            indent=None if args.compact else 4,
+            zip_name="bunpro_dict.zip" if args.zip_direct else None,
+            compresslevel=args.compression_level,
+            parallel_compression=args.parallel_compression,
+            page_store_path=args.page_store,
+            profiler=profiler,
+            prefetch=args.prefetch,
+        )
+        if not args.zip_direct:
+            with profiler.stage("zip_directory") if profiler else nullcontext():
+                zip_directory("dictionary_files", "bunpro_dict.zip", args.compression_level)
+        if profiler is not None:
+            profiler.stop()
+
+    if args.cprofile:
+        run_with_cprofile(args.cprofile, build)
+    else:
+        build()
+    if profiler is not None:
+        profiler.write_report(args.profile)
+        profiler.print_summary()
@@ -1,86 +1,26 @@
+import argparse
 import logging
 import os
-import re
-import importlib.resources
-from bs4 import BeautifulSoup
-import pandas as pd
-from dictionary_construction.const import fix_pos
+import time
+from typing import TYPE_CHECKING
+from dictionary_construction.Entry import Dictionary_Entry
+from dictionary_construction.intermediate import COLUMNS, TYPED_COLUMNS, write_entries
 
+# pandas and bs4 are only needed once a build runs, so they are imported there
+if TYPE_CHECKING:
+    import pandas as pd
+    from bs4 import BeautifulSoup
 
 
-# Create a logger
-logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
 
-# Create a file handler for errors and warnings with UTF-8 encoding
-file_handler = logging.FileHandler("dataframe_errors.log", encoding="utf-8")
-file_handler.setLevel(logging.WARNING)
-
-# Create a console handler to output to the console
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)  # Log info and above to console
-
-# Create a logging format and add it to the handlers
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
-
-# Add the handlers to the logger
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+logger = logging.getLogger(__name__)
 
 path_to_html_files = r"grammar_pages"
-page_list = os.listdir(path_to_html_files)
-
-
-def extract_explination(soup: BeautifulSoup) -> str:
-    main_div = soup.find("div", class_="bp-ddw bp-writeup-body prose")
-
-    try:
-        for example_section in main_div.find_all(
-            class_=["writeup-example--japanese", "writeup-example--english"]
-        ):
-            example_section.decompose()
-        explination = main_div.get_text(separator=" ", strip=True)
-        return explination
-    except AttributeError:
-        logger.warning(
-            f"Could not find example sections in {soup.find('title').get_text(strip=True)}"
-        )
-        return "Error: Could not extract explanation"
-
-    # Extract the remaining text
-
-
-def determine_pos(soup: BeautifulSoup) -> str:
-    title = soup.select("ul h4")
-    labels = soup.select("ul > li > p")
-    for t, l in zip(title, labels):
-        if t.get_text(strip=True) == "Part of Speech":
-            result = l.get_text(strip=True)
-            result = fix_pos.get(result)
-            if result:
-                return result
-            else:
-                raise ValueError(f"Unknown POS: {result}")
-    return ""
-
-
-def remove_latin_chars(text):
-    # Regular expression to match Latin characters (a-z, A-Z)
-    return re.sub(r"[a-zA-Z,]", "", text)
-
-
-def JLPT_level(soup: BeautifulSoup) -> str:
-    title = soup.find("title").get_text(strip=True)
-    # Extract the JLPT level from the title
-    jlpt = title.split("JLPT")[1].strip(") | Bunpro")
-    if jlpt not in ["N5", "N4", "N3", "N2", "N1", "N0"]:
-        raise ValueError(f"Unknown JLPT level: {jlpt}")
-    return jlpt
 
 
 def split_and_duplicate_rows(row):
+    import pandas as pd
+
     # Split the 'subject' column by the '・' character
     splits = row["subject"].split("・")
     # Duplicate the row for each split
@@ -97,45 +37,122 @@ def split_and_duplicate_rows(row):
     )
 
 
-def main():
-    df = pd.DataFrame(
-        columns=[
-            "subject",
-            "reading",
-            "part_of_speech",
-            "definition",
-            "explanation",
-            "link"
-            "JLPT",
-        ]
-    )
-    for page in page_list:
-        with open(os.path.join(path_to_html_files, page), "r", encoding="utf-8") as f:
+def extract_row(page: str, soup: "BeautifulSoup"):
+    """
+    Extracts the CSV columns from one page, or returns None if the page is skipped.
+    """
+    record = Dictionary_Entry(soup).to_record()
+    if record.subject == "" or record.definition == "()":
+        logger.warning(
+            f"Skipping {page} with grammar point {record.term_long_name} as it has no subject or definition."
+        )
+        return None
+    return {
+        "subject": record.subject,
+        "reading": record.term_long_name,
+        "part_of_speech": record.part_of_speech,
+        "definition": record.definition,
+        "explanation": record.explanation,
+        "link": record.link,
+        "JLPT": record.JLPT,
+        "example_sentences": list(record.example_sentences),
+    }
+
+
+def extract_rows(pages, pages_dir=path_to_html_files) -> list:
+    """
+    Collects one dict per usable page in a single pass.
+    """
+    from bs4 import BeautifulSoup
+
+    rows = []
+    for page in pages:
+        with open(os.path.join(pages_dir, page), "r", encoding="utf-8") as f:
             soup = BeautifulSoup(f, "html.parser", from_encoding="utf-8")
-
-        entry_contents = {
-            "subject": remove_latin_chars(
-                soup.find("h1").get_text(strip=True).split(" ")[0]
-            ),
-            "reading": soup.find("title").get_text(strip=True).split(" ")[0],
-            "part_of_speech": determine_pos(soup),
-            "definition": soup.select_one("p.line-clamp-1").get_text(strip=True),
-            "explanation": extract_explination(soup),
-            "link": soup.select_one('head > link[rel="canonical"]')['href'],
-            "JLPT": JLPT_level(soup),
-        }
-        if entry_contents["subject"] == "" or entry_contents["definition"] == "()":
-            logger.warning(
-                f"Skipping {page} with grammar point {soup.find("title").get_text(strip=True).split(' ')[0]} as it has no subject or definition."
-            )
-            continue
-        df = pd.concat([df, pd.DataFrame(entry_contents, index=[0])], ignore_index=True)
-
-    expanded_df = pd.concat(
+        row = extract_row(page, soup)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def build_dataframe(rows: list) -> "pd.DataFrame":
+    """
+    Builds the frame once from the collected rows and gives every "・" variant of a
+    subject its own row, copying the other columns.
+    """
+    import pandas as pd
+
+    df = pd.DataFrame.from_records(rows, columns=TYPED_COLUMNS)
+    df["subject"] = df["subject"].str.split("・")
+    return df.explode("subject", ignore_index=True)
+
+
+def build_dataframe_rowwise(rows: list) -> "pd.DataFrame":
+    """
+    The previous per-row pd.concat + apply build, kept as the benchmark reference.
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(columns=COLUMNS)
+    for row in rows:
+        row = {column: row[column] for column in COLUMNS}
+        df = pd.concat([df, pd.DataFrame(row, index=[0])], ignore_index=True)
+    return pd.concat(
         df.apply(split_and_duplicate_rows, axis=1).tolist(), ignore_index=True
     )
-    expanded_df.to_csv("bunpro_entries.csv", index=False)
+
+
+def benchmark(rows: list, repeat=3):
+    """
+    Times both builds on the same rows and checks they write identical CSVs.
+    """
+    timings = {}
+    outputs = {}
+    for name, build in [
+        ("rowwise", build_dataframe_rowwise),
+        ("columnar", build_dataframe),
+    ]:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = build(rows)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+        outputs[name] = df[COLUMNS].to_csv(index=False)
+    logger.info(
+        f"{len(rows)} pages: rowwise {timings['rowwise']:.3f}s, "
+        f"columnar {timings['columnar']:.3f}s "
+        f"({timings['rowwise'] / timings['columnar']:.0f}x faster)"
+    )
+    if outputs["rowwise"] != outputs["columnar"]:
+        raise AssertionError("Columnar build does not match the rowwise CSV output.")
+    return timings
+
+
+def main(run_benchmark=False, output="bunpro_entries.csv", pages_dir=path_to_html_files):
+    pages = sorted(page for page in os.listdir(pages_dir) if page.endswith(".html"))
+    rows = extract_rows(pages, pages_dir)
+    if run_benchmark:
+        benchmark(rows)
+
+    expanded_df = build_dataframe(rows)
+    write_entries(expanded_df, output)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build bunpro_entries.csv.")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Time the columnar build against the previous rowwise build.",
+    )
+    parser.add_argument(
+        "--output",
+        default="bunpro_entries.csv",
+        help="Output file; .parquet or .arrow write a typed intermediate with example sentences.",
+    )
+    args = parser.parse_args()
+    from scraper.bunpro import setup_logging
+
+    setup_logging("dataframe_errors.log")
+    main(run_benchmark=args.benchmark, output=args.output)
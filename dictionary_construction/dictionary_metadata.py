@@ -0,0 +1,97 @@
+import json
+import os
+from dictionary_construction.const import JLPT, READING, SUBJECT
+
+DICTIONARY_TITLE = "Bunpro Dictionary"
+# Bump by hand for format changes; the content digest is appended on every build
+BASE_REVISION = "1.0.0"
+
+# Frequency rank of each JLPT level: the level a grammar point is taught at is
+# the closest thing Bunpro has to a frequency, so N5 points rank first
+JLPT_RANKS = {"N5": 1, "N4": 2, "N3": 3, "N2": 4, "N1": 5, "N0": 6}
+UNRANKED = len(JLPT_RANKS) + 1
+
+
+class DictionaryMetadata:
+    """
+    Collects what the tag bank, the JLPT frequency bank and index.json need while
+    the term banks are being written, so they come out of the same pass over the
+    records. Only the tags in use and one rank per (term, reading) are kept.
+    """
+
+    def __init__(self):
+        self.jlpt_tags = set()
+        self.ranks = {}
+        self.entry_count = 0
+
+    def observe(self, entry):
+        subject, reading = entry[SUBJECT], entry[READING]
+        level = entry[JLPT]
+        self.jlpt_tags.update(level.split())
+        rank = JLPT_RANKS.get(level, UNRANKED)
+        known = self.ranks.get((subject, reading))
+        if known is None or rank < known[0]:
+            self.ranks[(subject, reading)] = (rank, level)
+        self.entry_count += 1
+
+    def track(self, entries):
+        """Yields entries unchanged, observing each on the way to the writer."""
+        for entry in entries:
+            self.observe(entry)
+            yield entry
+
+    def tag_bank(self) -> list:
+        """
+        [name, category, order, notes, score] rows for the JLPT levels in the term
+        tags. The part of speech sits in the rules slot, which Yomitan matches
+        against deinflection rules rather than tags, so it gets no tag rows.
+        """
+        return [
+            [level, "frequency", JLPT_RANKS.get(level, UNRANKED), f"JLPT {level}", 0]
+            for level in sorted(self.jlpt_tags, key=lambda level: JLPT_RANKS.get(level, UNRANKED))
+        ]
+
+    def term_meta_bank(self) -> list:
+        """
+        Rank-based "freq" rows, one per (term, reading), showing the JLPT level.
+        Terms without a reading get a bare frequency that applies to every reading.
+        """
+        rows = []
+        for (subject, reading), (rank, level) in self.ranks.items():
+            frequency = {"value": rank, "displayValue": level}
+            if reading:
+                frequency = {"reading": reading, "frequency": frequency}
+            rows.append([subject, "freq", frequency])
+        return rows
+
+    def index(self, digest: str) -> dict:
+        """
+        index.json for the build; the revision ends with a digest of the term bank
+        bytes, so it changes exactly when the entries do.
+        """
+        return {
+            "title": DICTIONARY_TITLE,
+            "format": 3,
+            "revision": f"{BASE_REVISION}.{digest[:12]}",
+            "sequenced": True,
+            "frequencyMode": "rank-based",
+        }
+
+
+def write_metadata_banks(metadata, open_writer, digest) -> str:
+    """
+    Writes tag_bank_{n}.json and term_meta_bank_{n}.json through writers made by
+    open_writer(prefix) and returns the encoded index.json.
+    """
+    for prefix, rows in [
+        ("tag_bank", metadata.tag_bank()),
+        ("term_meta_bank", metadata.term_meta_bank()),
+    ]:
+        with open_writer(prefix) as writer:
+            writer.write_all(rows)
+    return json.dumps(metadata.index(digest), ensure_ascii=False, indent=4)
+
+
+def write_index(directory, index_json: str):
+    with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+        f.write(index_json)
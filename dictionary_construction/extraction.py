@@ -0,0 +1,118 @@
+import os
+from dictionary_construction.Entry import Dictionary_Entry, Entry_Record
+
+
+def generate_entry(entry: Entry_Record) -> list:
+    """
+    Generates a dictionary structure for the desired JSON schema with dynamic example sentences.
+    """
+    # Create the list of example sentence structures dynamically
+    example_sentence_list = [
+        {
+            "tag": "li",
+            "style": {"listStyleType": f"'{chr(9311 + idx)}'"},
+            "content": sentence
+        }
+        for idx, sentence in enumerate(entry.example_sentences, start=1)
+    ]
+    
+    # JSON structure based on provided schema
+    data = [
+        entry.subject,
+        entry.reading,
+        entry.term_long_name,
+        entry.part_of_speech,
+        0,
+        [
+            {
+                "type": "structured-content",
+                "content": [
+                    "【 Meaning 】",
+                    {"tag": "div", "style": {"marginLeft": 1}, "content": entry.definition},
+                    "【 Explanation 】",
+                    {"tag": "div", "style": {"marginLeft": 1}, "content": entry.explanation},
+                    "【 Example sentences 】",
+                    {
+                        "tag": "ol",
+                        "content": example_sentence_list,
+                    },
+                ],
+            },
+            {
+                "type": "structured-content",
+                "content": [
+                    {
+                        "tag": "a",
+                        "href": entry.link,
+                        "content": "Link to Bunpro",
+                    }
+                ]
+            }
+        ],
+        1,
+        entry.JLPT,
+    ]
+    return data
+
+
+def read_page(path_to_html_files, page) -> str:
+    """
+    Reads a page from a grammar_pages directory or from a PageStore.
+    """
+    if not isinstance(path_to_html_files, (str, os.PathLike)):
+        return path_to_html_files.read_text(page)
+    with open(os.path.join(path_to_html_files, page), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def list_pages(path_to_html_files) -> list:
+    """
+    Returns the saved grammar page names in a stable, sorted order.
+    """
+    if not isinstance(path_to_html_files, (str, os.PathLike)):
+        return path_to_html_files.names()
+    return sorted(
+        page for page in os.listdir(path_to_html_files) if page.endswith(".html")
+    )
+
+
+def read_pages(path_to_html_files):
+    """
+    Yields (page, html) pairs for every saved grammar page in a stable, sorted order.
+    """
+    for page in list_pages(path_to_html_files):
+        yield page, read_page(path_to_html_files, page)
+
+
+def parse_entry(html: str, backend="bs4", populate=True) -> Dictionary_Entry:
+    """
+    Builds a Dictionary_Entry with the requested parser backend ("bs4" or "lxml").
+    With populate=False the page is only parsed; call populate() to extract the fields.
+    """
+    # The parsers are imported on first use, so importing this module stays cheap
+    if backend == "bs4":
+        from bs4 import BeautifulSoup
+
+        return Dictionary_Entry(BeautifulSoup(html, "html.parser"), populate)
+    if backend == "lxml":
+        from dictionary_construction.lxml_entry import Lxml_Entry
+
+        return Lxml_Entry(html, populate)
+    raise ValueError(f"Unknown parser backend: {backend}")
+
+
+def extract_entry(html: str, backend="bs4") -> Entry_Record:
+    """
+    Parses a single page into an Entry_Record; the parsed page is dropped on return.
+    """
+    return parse_entry(html, backend).to_record()
+
+
+def extract_record(html: str, backend="bs4") -> list:
+    """
+    Parses a single page and returns its term bank record.
+
+    Only the plain list produced by generate_entry leaves this function, so it can be
+    sent back from a worker process without pickling the soup.
+    """
+    return generate_entry(extract_entry(html, backend))
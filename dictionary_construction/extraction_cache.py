@@ -0,0 +1,62 @@
+import hashlib
+import json
+import sqlite3
+from dictionary_construction.const import EXTRACTOR_VERSION
+
+
+def content_hash(html: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a page's contents.
+    """
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Persistent store of generate_entry output, keyed by page, content hash and
+    extractor version.
+
+    A cached record is only returned when all three match, so editing a page or
+    bumping EXTRACTOR_VERSION in const.py forces that page to be parsed again.
+    """
+
+    def __init__(self, path: str, extractor_version: int = EXTRACTOR_VERSION):
+        self.path = path
+        self.extractor_version = extractor_version
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                page TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                extractor_version INTEGER NOT NULL,
+                record TEXT NOT NULL
+            )
+            """
+        )
+
+    def get(self, page: str, digest: str):
+        row = self.connection.execute(
+            "SELECT record FROM records "
+            "WHERE page = ? AND content_hash = ? AND extractor_version = ?",
+            (page, digest, self.extractor_version),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def put(self, page: str, digest: str, record: list):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+            (page, digest, self.extractor_version, json.dumps(record, ensure_ascii=False)),
+        )
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
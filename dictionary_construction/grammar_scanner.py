@@ -0,0 +1,255 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dictionary_construction.const import JLPT, SUBJECT
+from dictionary_construction.term_index import iter_term_bank_entries, subject_keys
+
+GrammarMatch = namedtuple("GrammarMatch", ["start", "end", "subject", "JLPT"])
+
+# Placeholders in subjects such as "たとえ〜ても"; the pieces between them must
+# appear in order but need not be adjacent
+GAP = re.compile(r"[～〜~]+")
+# Decoration that never appears in running text
+DECORATION = re.compile(r"[()（）]|\.\.\.|…")
+
+
+def surface_fragments(subject: str) -> tuple:
+    """
+    Splits a subject into the fragments that have to occur, in order, in a sentence.
+    """
+    fragments = GAP.split(DECORATION.sub("", subject))
+    return tuple(fragment for fragment in fragments if fragment)
+
+
+class GrammarScanner:
+    """
+    Finds every grammar point occurring in a text with one Aho–Corasick pass.
+
+    The automaton is built once over the fragments of every surface form (each
+    subject and its "・" variants). Forms with placeholders, e.g. "たとえ〜ても",
+    are reported when all their fragments occur in order, so scanning stays linear
+    in the text plus the number of fragment hits.
+    """
+
+    def __init__(self, grammar_points, min_length=1):
+        """
+        grammar_points is an iterable of (subject, JLPT) pairs. Surface forms with
+        fewer than min_length characters in total are ignored.
+        """
+        self.forms = []
+        self.fragment_ids = {}
+        self.fragments = []
+        # Per fragment: the forms it makes up on its own, and the gapped forms it starts
+        self.single_forms = []
+        self.gapped_starts = []
+        # Fragments whose positions have to be kept for gapped forms
+        self.gapped_parts = set()
+        seen = set()
+        for subject, jlpt in grammar_points:
+            for surface in subject_keys(subject):
+                fragments = surface_fragments(surface)
+                if sum(map(len, fragments)) < min_length or (fragments, subject) in seen:
+                    continue
+                seen.add((fragments, subject))
+                form_id = len(self.forms)
+                self.forms.append((fragments, subject, jlpt))
+                ids = [self._fragment_id(fragment) for fragment in fragments]
+                if len(ids) == 1:
+                    self.single_forms[ids[0]].append(GrammarMatch(0, 0, subject, jlpt))
+                else:
+                    self.gapped_starts[ids[0]].append(form_id)
+                    self.gapped_parts.update(ids)
+        logging.debug(f"Built scanner over {len(self.forms)} surface forms.")
+        self._build_automaton()
+
+    def _fragment_id(self, fragment) -> int:
+        fragment_id = self.fragment_ids.get(fragment)
+        if fragment_id is None:
+            fragment_id = self.fragment_ids[fragment] = len(self.fragments)
+            self.fragments.append(fragment)
+            self.single_forms.append([])
+            self.gapped_starts.append([])
+        return fragment_id
+
+    @classmethod
+    def from_term_banks(cls, source, min_length=1):
+        """Builds a scanner from the term banks in a directory or dictionary zip."""
+        return cls(
+            ((entry[SUBJECT], entry[JLPT]) for entry in iter_term_bank_entries(source)),
+            min_length,
+        )
+
+    def _build_automaton(self):
+        self.goto = [{}]
+        self.fail = [0]
+        # Fragment ids ending at each state, including those reached by fail links
+        self.outputs = [()]
+        for fragment_id, fragment in enumerate(self.fragments):
+            state = 0
+            for char in fragment:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append(())
+                state = next_state
+            self.outputs[state] += (fragment_id,)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.outputs[next_state] += self.outputs[self.fail[next_state]]
+                queue.append(next_state)
+
+    def _fragment_hits(self, text):
+        goto, fail, outputs, fragments = self.goto, self.fail, self.outputs, self.fragments
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for fragment_id in outputs[state]:
+                yield end - len(fragments[fragment_id]), end, fragment_id
+
+    def find_all(self, text: str) -> list:
+        """
+        Every grammar point occurring in text, as GrammarMatch tuples sorted by
+        position. A form with placeholders is matched once, at its earliest start.
+        """
+        matches = []
+        # Start/end positions of each fragment, for forms that need more than one
+        gapped_hits = {}
+        for start, end, fragment_id in self._fragment_hits(text):
+            for form in self.single_forms[fragment_id]:
+                matches.append(form._replace(start=start, end=end))
+            if fragment_id in self.gapped_parts:
+                gapped_hits.setdefault(fragment_id, []).append((start, end))
+
+        if gapped_hits:
+            matches.extend(self._gapped_matches(gapped_hits))
+        matches.sort()
+        return matches
+
+    def _gapped_matches(self, gapped_hits):
+        candidates = [
+            form_id for fragment_id in gapped_hits for form_id in self.gapped_starts[fragment_id]
+        ]
+        for form_id in candidates:
+            fragments, subject, jlpt = self.forms[form_id]
+            hits = [gapped_hits.get(self.fragment_ids[fragment], ()) for fragment in fragments]
+            if not all(hits):
+                continue
+            start = hits[0][0][0]
+            end = hits[0][0][1]
+            for fragment_hits in hits[1:]:
+                following = next((hit for hit in fragment_hits if hit[0] >= end), None)
+                if following is None:
+                    break
+                end = following[1]
+            else:
+                yield GrammarMatch(start, end, subject, jlpt)
+
+    def longest_matches(self, text: str) -> list:
+        """
+        Leftmost-longest, non-overlapping matches: at each position the longest
+        grammar point wins and scanning resumes after it.
+        """
+        selected = []
+        covered = 0
+        for match in sorted(self.find_all(text), key=lambda m: (m.start, m.start - m.end)):
+            if match.start >= covered:
+                selected.append(match)
+                covered = match.end
+        return selected
+
+    def scan(self, sentences, longest=False):
+        """Yields the matches for each sentence, lazily and in order."""
+        find = self.longest_matches if longest else self.find_all
+        for sentence in sentences:
+            yield find(sentence)
+
+
+# The scanner each pool worker builds once in its initializer
+_worker_scanner = None
+
+
+def _init_worker(source, min_length):
+    global _worker_scanner
+    _worker_scanner = GrammarScanner.from_term_banks(source, min_length)
+
+
+def _scan_batch(batch, longest):
+    return list(_worker_scanner.scan(batch, longest))
+
+
+def scan_parallel(source, sentences, workers=None, batch_size=1000, longest=False, min_length=1):
+    """
+    scan() over a process pool. Every worker builds its own scanner from the term
+    banks in source, and sentences are sent in batches with at most two batches
+    per worker in flight, so arbitrarily long streams run in bounded memory.
+    Results are yielded in input order.
+    """
+    workers = workers or os.cpu_count()
+    sentences = iter(sentences)
+    batches = iter(lambda: list(itertools.islice(sentences, batch_size)), [])
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(source, min_length)
+    ) as executor:
+        in_flight = deque()
+        limit = 2 * workers
+        for batch in batches:
+            in_flight.append(executor.submit(_scan_batch, batch, longest))
+            if len(in_flight) >= limit:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Tag sentences (one per line on stdin) with the grammar points they contain."
+    )
+    parser.add_argument(
+        "--source",
+        default="dictionary_files",
+        help="Term bank directory or dictionary zip to take grammar points from.",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = one per CPU).")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Sentences per worker batch.")
+    parser.add_argument("--longest", action="store_true", help="Report leftmost-longest matches only.")
+    parser.add_argument(
+        "--min-length",
+        type=int,
+        default=1,
+        help="Ignore surface forms shorter than this many characters.",
+    )
+    args = parser.parse_args()
+
+    sentences = (line.rstrip("\n") for line in sys.stdin)
+    if args.workers == 1:
+        scanner = GrammarScanner.from_term_banks(args.source, args.min_length)
+        results = scanner.scan(sentences, args.longest)
+    else:
+        results = scan_parallel(
+            args.source,
+            sentences,
+            args.workers or None,
+            args.batch_size,
+            args.longest,
+            args.min_length,
+        )
+    for matches in results:
+        print(json.dumps([match._asdict() for match in matches], ensure_ascii=False))
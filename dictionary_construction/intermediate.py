@@ -0,0 +1,131 @@
+from typing import TYPE_CHECKING
+
+# pandas is only imported by the functions that need it
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Columns of bunpro_entries.csv, in file order
+COLUMNS = [
+    "subject",
+    "reading",
+    "part_of_speech",
+    "definition",
+    "explanation",
+    "link",
+    "JLPT",
+]
+
+# The typed formats also carry the example sentences as a list column
+TYPED_COLUMNS = COLUMNS + ["example_sentences"]
+
+# Long texts that repeat across the "・" variants of a grammar point. The typed
+# formats dictionary-encode them, so each distinct text is stored once and rows
+# refer to it by index.
+TEXT_COLUMNS = ["definition", "explanation", "example_sentences"]
+
+
+def entry_schema(dictionary_encoded=True):
+    import pyarrow as pa
+
+    text = pa.dictionary(pa.int32(), pa.string()) if dictionary_encoded else pa.string()
+    return pa.schema(
+        [(column, text if column in TEXT_COLUMNS else pa.string()) for column in COLUMNS]
+        + [("example_sentences", pa.list_(text))]
+    )
+
+
+def write_entries(df: "pd.DataFrame", path: str):
+    """
+    Writes the entries frame as CSV, Parquet (.parquet) or Arrow IPC (.arrow).
+
+    The Arrow file is left uncompressed so read_entries can memory-map it.
+    """
+    if path.endswith(".csv"):
+        df[COLUMNS].to_csv(path, index=False)
+        return
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df[TYPED_COLUMNS], schema=entry_schema(), preserve_index=False)
+    if path.endswith(".parquet"):
+        pq.write_table(table, path)
+    elif path.endswith(".arrow"):
+        feather.write_feather(table, path, compression="uncompressed")
+    else:
+        raise ValueError(f"Unknown intermediate format: {path}")
+
+
+def read_table(path: str):
+    """
+    Opens a Parquet or Arrow intermediate as a pyarrow Table; Arrow files are
+    memory-mapped rather than read into memory.
+    """
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    if path.endswith(".parquet"):
+        return pq.read_table(path, memory_map=True)
+    if path.endswith(".arrow"):
+        return feather.read_table(path, memory_map=True)
+    raise ValueError(f"Unknown intermediate format: {path}")
+
+
+def read_columns(path: str) -> dict:
+    """
+    Reads an intermediate as a dict of plain column lists, skipping the DataFrame.
+
+    Missing parts of speech from the CSV come back as "" instead of NaN.
+    """
+    if path.endswith(".csv"):
+        import pandas as pd
+
+        df = pd.read_csv(path)
+        df["part_of_speech"] = df["part_of_speech"].fillna("")
+        return {column: df[column].tolist() for column in df.columns}
+    table = read_table(path)
+    return {column: column_values(table.column(column)) for column in table.column_names}
+
+
+def column_values(column) -> list:
+    """
+    Converts a pyarrow column to a list. Dictionary-encoded texts are expanded to
+    one shared str per distinct text rather than one copy per row.
+    """
+    import pyarrow as pa
+
+    if pa.types.is_dictionary(column.type):
+        values = []
+        for chunk in column.chunks:
+            texts = chunk.dictionary.to_pylist()
+            values.extend(None if i is None else texts[i] for i in chunk.indices.to_pylist())
+        return values
+    if pa.types.is_list(column.type) and pa.types.is_dictionary(column.type.value_type):
+        values = []
+        for chunk in column.chunks:
+            # values and offsets ignore the chunk's slice, so offsets index values directly
+            texts = chunk.values.dictionary.to_pylist()
+            indices = chunk.values.indices.to_pylist()
+            offsets = chunk.offsets.to_pylist()
+            for valid, start, end in zip(chunk.is_valid().to_pylist(), offsets, offsets[1:]):
+                values.append([texts[i] for i in indices[start:end]] if valid else None)
+        return values
+    return column.to_pylist()
+
+
+def read_entries(path: str) -> "pd.DataFrame":
+    """
+    Reads an intermediate written by write_entries back into a DataFrame.
+
+    As with read_columns, missing parts of speech from the CSV come back as "".
+    """
+    if path.endswith(".csv"):
+        import pandas as pd
+
+        df = pd.read_csv(path)
+        df["part_of_speech"] = df["part_of_speech"].fillna("")
+        return df
+    # Decode the dictionary columns so the frame holds strings, not categoricals
+    table = read_table(path)
+    return table.cast(entry_schema(dictionary_encoded=False)).to_pandas()
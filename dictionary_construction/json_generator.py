@@ -1,13 +1,185 @@
+import argparse
 import json
-import pandas as pd
-import numpy as np
+import os
+import time
+from dictionary_construction.dictionary_metadata import (
+    DictionaryMetadata,
+    write_index,
+    write_metadata_banks,
+)
+from dictionary_construction.intermediate import read_columns, read_entries
+from dictionary_construction.term_bank_writer import (
+    DEFAULT_MAX_BYTES,
+    TermBankWriter,
+    staged_directory,
+)
+
+
+# Constant parts of the structured content. They are shared by every entry rather
+# than rebuilt per row, so entries must be treated as read-only once composed.
+INDENT_STYLE = {"marginLeft": 1}
+LINK_LABEL = "Link to Bunpro"
+PLACEHOLDER_EXAMPLES = [
+    {
+        "tag": "li",
+        "style": {"listStyleType": "'①'"},
+        "content": "例文 1\nSentence 1",
+    },
+    {
+        "tag": "li",
+        "style": {"listStyleType": "'②'"},
+        "content": "Sentence 2",
+    },
+]
+_list_styles = {}
+
+
+def list_style(idx: int) -> dict:
+    style = _list_styles.get(idx)
+    if style is None:
+        style = _list_styles[idx] = {"listStyleType": f"'{chr(9311 + idx)}'"}
+    return style
+
+
+def compose_example_list(example_sentences) -> list:
+    if example_sentences is None:
+        # bunpro_entries.csv has no example sentences
+        return PLACEHOLDER_EXAMPLES
+    return [
+        {"tag": "li", "style": list_style(idx), "content": sentence}
+        for idx, sentence in enumerate(example_sentences, start=1)
+    ]
+
+
+def compose_entries(columns: dict) -> list:
+    """
+    Builds term bank entries straight from column lists (see read_columns).
+
+    Optional columns fall back to compose_entry's defaults when they are missing,
+    and term_long_name, which bunpro_entries does not have, to "".
+    """
+    n_rows = len(columns["subject"])
+
+    def column(name, default):
+        values = columns.get(name)
+        return [default] * n_rows if values is None else values
+
+    glossaries = {}
+
+    def glossary(definition, explanation, example_sentences, link):
+        # The "・" variants of a grammar point share one glossary object instead of
+        # each building a copy of the same long texts
+        key = (
+            definition,
+            explanation,
+            None if example_sentences is None else tuple(example_sentences),
+            link,
+        )
+        composed = glossaries.get(key)
+        if composed is None:
+            composed = glossaries[key] = [
+                {
+                    "type": "structured-content",
+                    "content": [
+                        "【 Meaning 】",
+                        {"tag": "div", "style": INDENT_STYLE, "content": definition},
+                        "【 Explination 】",
+                        {"tag": "div", "style": INDENT_STYLE, "content": explanation},
+                        "【 Example sentences 】",
+                        {
+                            "tag": "ol",
+                            "content": compose_example_list(example_sentences),
+                        },
+                    ],
+                },
+                {
+                    "type": "structured-content",
+                    "content": [
+                        {
+                            "tag": "a",
+                            "href": link,
+                            "content": LINK_LABEL,
+                        }
+                    ]
+                }
+            ]
+        return composed
+
+    return [
+        [
+            subject,  # Kanji
+            reading,  # Kana
+            term_long_name,  # Part of speech 1
+            part_of_speech,  # Part of speech 2
+            matchup,
+            glossary(definition, explanation, example_sentences, link),
+            1,  # Some boolean flag
+            JLPT,  # JLPT Level
+        ]
+        for (
+            subject,
+            reading,
+            term_long_name,
+            part_of_speech,
+            matchup,
+            definition,
+            explanation,
+            example_sentences,
+            link,
+            JLPT,
+        ) in zip(
+            columns["subject"],
+            columns["reading"],
+            column("term_long_name", ""),
+            columns["part_of_speech"],
+            column("matchup", 10),
+            columns["definition"],
+            columns["explanation"],
+            column("example_sentences", None),
+            columns["link"],
+            column("JLPT", "N5"),
+        )
+    ]
 
 
 def compose_entry(
-    subject, reading, term_long_name, part_of_speech, definition, explanation, link, matchup=10, JLPT="N5"
-) -> str:
-    if part_of_speech is np.nan:
-        part_of_speech = ""
+    subject,
+    reading,
+    term_long_name,
+    part_of_speech,
+    definition,
+    explanation,
+    link,
+    matchup=10,
+    JLPT="N5",
+    example_sentences=None,
+) -> list:
+    """
+    The previous per-row composer, kept as the benchmark reference. Every entry
+    gets its own copy of the structured content.
+    """
+    if example_sentences is None:
+        examples = [
+            {
+                "tag": "li",
+                "style": {"listStyleType": "'①'"},
+                "content": "例文 1\nSentence 1",
+            },
+            {
+                "tag": "li",
+                "style": {"listStyleType": "'②'"},
+                "content": "Sentence 2",
+            },
+        ]
+    else:
+        examples = [
+            {
+                "tag": "li",
+                "style": {"listStyleType": f"'{chr(9311 + idx)}'"},
+                "content": sentence,
+            }
+            for idx, sentence in enumerate(example_sentences, start=1)
+        ]
     data = [
         subject,  # Kanji
         reading,  # Kana
@@ -25,18 +197,7 @@ def compose_entry(
                     "【 Example sentences 】",
                     {
                         "tag": "ol",
-                        "content": [
-                            {
-                                "tag": "li",
-                                "style": {"listStyleType": "'①'"},
-                                "content": "例文 1\nSentence 1",
-                            },
-                            {
-                                "tag": "li",
-                                "style": {"listStyleType": "'②'"},
-                                "content": "Sentence 2",
-                            },
-                        ],
+                        "content": examples,
                     },
                 ],
             },
@@ -57,16 +218,77 @@ def compose_entry(
     return data
 
 
-def main():
-    df = pd.read_csv(r"dictionary_construction\bunpro_entries.csv")
-    result = df.apply(
-        lambda row: compose_entry(**row), axis=1
-    ).tolist()  # Convert to a list
-    # break the list up into 4 files
-    for i in range(4):
-        with open(fr"dictionary_files\term_bank_{i+1}.json", "w", encoding="utf-8") as f:
-            json.dump(result[i::4], f, indent=4, ensure_ascii=False)
+def benchmark(path, repeat=3):
+    """
+    Times df.apply(compose_entry) against compose_entries on the same input and
+    checks they produce the same entries.
+    """
+    timings = {}
+    outputs = {}
+    builds = {
+        "apply": lambda: read_entries(path).apply(
+            lambda row: compose_entry(**{"term_long_name": "", **row}), axis=1
+        ).tolist(),
+        "batch": lambda: compose_entries(read_columns(path)),
+    }
+    for name, build in builds.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs[name] = build()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    print(
+        f"{len(outputs['batch'])} entries: apply {timings['apply']:.3f}s, "
+        f"batch {timings['batch']:.3f}s"
+    )
+    if json.dumps(outputs["apply"], ensure_ascii=False) != json.dumps(
+        outputs["batch"], ensure_ascii=False
+    ):
+        raise AssertionError("compose_entries does not match compose_entry.")
+    return timings
+
+
+def main(
+    path=os.path.join("dictionary_construction", "bunpro_entries.csv"),
+    indent=4,
+    max_bytes=DEFAULT_MAX_BYTES,
+):
+    directory = "dictionary_files"
+    entries = compose_entries(read_columns(path))
+    metadata = DictionaryMetadata()
+    with staged_directory(directory) as staging:
+        with TermBankWriter(staging, max_bytes=max_bytes, indent=indent) as writer:
+            writer.write_all(metadata.track(entries))
+        index_json = write_metadata_banks(
+            metadata,
+            lambda prefix: TermBankWriter(staging, max_bytes=max_bytes, indent=indent, prefix=prefix),
+            writer.digest,
+        )
+        write_index(staging, index_json)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build term banks from bunpro_entries.")
+    parser.add_argument(
+        "--input",
+        default=os.path.join("dictionary_construction", "bunpro_entries.csv"),
+        help="bunpro_entries .csv, .parquet or memory-mapped .arrow file.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help=(
+            "Write term banks without indentation. Only compact banks are encoded "
+            "with orjson (the 'fast' extra); indented banks always use json."
+        ),
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Compare the batch composer against df.apply(compose_entry).",
+    )
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(args.input)
+    main(args.input, indent=None if args.compact else 4)
@@ -0,0 +1,187 @@
+try:
+    import lxml.html
+except ImportError:  # lxml is an optional speed-up, see the "fast" extra
+    lxml = None
+from dictionary_construction.const import (
+    CANONICAL_REL,
+    DEFINITION_CLASS,
+    EN_EXAMPLE_CLASSES,
+    EXAMPLE_SECTION_CLASSES,
+    POS_LABEL_PATH,
+    POS_LIST_TAG,
+    POS_TITLE_TAG,
+    STUDY_QUESTION_ID,
+    WRITEUP_CLASS,
+)
+from dictionary_construction.Entry import Dictionary_Entry
+from dictionary_construction.extraction import generate_entry, list_pages, read_page
+
+NON_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
+
+
+def iter_strings(element):
+    """
+    Yields the text nodes below element in document order, skipping comments,
+    script/style contents and ruby readings the same way BeautifulSoup's get_text does.
+    """
+    if element.tag in NON_TEXT_TAGS:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str):
+            yield from iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def get_text(element, separator="", strip=False) -> str:
+    """
+    lxml equivalent of BeautifulSoup's Tag.get_text.
+    """
+    strings = iter_strings(element)
+    if strip:
+        strings = (s.strip() for s in strings)
+        strings = (s for s in strings if s)
+    return separator.join(strings)
+
+
+def class_tokens(element) -> set:
+    return set(element.get("class", "").split())
+
+
+def has_parents(element, path) -> bool:
+    """Whether element's tag and its parents' tags match path, innermost last."""
+    for tag in reversed(path):
+        if element is None or element.tag != tag:
+            return False
+        element = element.getparent()
+    return True
+
+
+class Lxml_Entry(Dictionary_Entry):
+    """
+    Dictionary_Entry backed by lxml instead of BeautifulSoup.
+
+    The document is parsed once and walked once; every node the extract_* methods
+    need is picked up during that single pass, so no method searches the tree again.
+    Produces the same attributes as Dictionary_Entry.
+    """
+
+    def __init__(self, html: str, populate=True):
+        if lxml is None:
+            raise ImportError("The lxml backend requires lxml to be installed.")
+        self.tree = lxml.html.document_fromstring(html)
+        self.collect_nodes()
+        self.title = get_text(self.title_node, strip=True)
+        if populate:
+            self.populate()
+
+    def collect_nodes(self):
+        self.title_node = None
+        self.h1_node = None
+        self.definition_node = None
+        self.writeup_node = None
+        self.link_node = None
+        self.pos_titles = []
+        self.pos_labels = []
+        self.example_nodes = []
+
+        for element in self.tree.iter():
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue
+            if tag == "title" and self.title_node is None:
+                self.title_node = element
+            elif tag == "h1" and self.h1_node is None:
+                self.h1_node = element
+            elif tag == POS_TITLE_TAG:
+                if next(element.iterancestors(POS_LIST_TAG), None) is not None:
+                    self.pos_titles.append(element)
+            elif tag == "p":
+                if has_parents(element, POS_LABEL_PATH):
+                    self.pos_labels.append(element)
+                if self.definition_node is None and DEFINITION_CLASS in class_tokens(element):
+                    self.definition_node = element
+            elif tag == "div":
+                if self.writeup_node is None and element.get("class") == WRITEUP_CLASS:
+                    self.writeup_node = element
+            elif tag == "link":
+                if (
+                    self.link_node is None
+                    and element.get("rel") == CANONICAL_REL
+                    and element.getparent().tag == "head"
+                ):
+                    self.link_node = element
+
+            element_id = element.get("id")
+            if element_id and STUDY_QUESTION_ID.match(element_id):
+                self.example_nodes.append(element)
+
+    def extract_subject(self):
+        return self.clean_subject(get_text(self.h1_node, strip=True))
+
+    def extract_pos(self):
+        title = [get_text(t, strip=True) for t in self.pos_titles]
+        labels = [get_text(l, strip=True) for l in self.pos_labels]
+        return self.lookup_pos(title, labels)
+
+    def extract_definition(self) -> str:
+        return get_text(self.definition_node, strip=True)
+
+    def extract_explanation(self) -> str:
+        if self.writeup_node is None:
+            print(f"Could not find example sections in {self.title}")
+            return "Error: Could not extract explanation"
+
+        example_sections = [
+            element
+            for element in self.writeup_node.iterdescendants()
+            if isinstance(element.tag, str) and not class_tokens(element).isdisjoint(EXAMPLE_SECTION_CLASSES)
+        ]
+        for example_section in example_sections:
+            example_section.drop_tree()
+        return get_text(self.writeup_node, separator=" ", strip=True)
+
+    def extract_jp_example(self) -> list:
+        result = []
+        for sentance in self.example_nodes:
+            jp_text = get_text(sentance, strip=True)
+            en_node = next(
+                element
+                for element in sentance.iterdescendants("p")
+                if EN_EXAMPLE_CLASSES <= class_tokens(element)
+            )
+            en_text = get_text(en_node)
+            result.append(self.format_example(jp_text, en_text))
+        return result
+
+    def extract_link(self) -> str:
+        return self.link_node.get("href")
+
+
+def compare_backends(path_to_html_files, pages=None) -> list:
+    """
+    Builds every page (or only the given pages) with both backends and returns the
+    pages whose entries differ.
+    """
+    from bs4 import BeautifulSoup
+
+    mismatches = []
+    for page in list_pages(path_to_html_files) if pages is None else pages:
+        html = read_page(path_to_html_files, page)
+        expected = generate_entry(Dictionary_Entry(BeautifulSoup(html, "html.parser")))
+        if generate_entry(Lxml_Entry(html)) != expected:
+            mismatches.append(page)
+    return mismatches
+
+
+if __name__ == "__main__":
+    # Golden-output check: the lxml backend must match the BeautifulSoup backend
+    # on every saved page before it is used for a release build.
+    mismatches = compare_backends("grammar_pages")
+    for page in mismatches:
+        print(f"Backends disagree on {page}")
+    if mismatches:
+        raise SystemExit(1)
+    print("Both backends produce identical entries.")
@@ -0,0 +1,173 @@
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dictionary_construction.extraction import extract_record, list_pages, read_page
+from dictionary_construction.extraction_cache import content_hash
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class PipelineStopped(Exception):
+    """Raised inside a stage when another stage failed and the pipeline is shutting down."""
+
+
+def _put(stage_queue, item, stop):
+    # Blocks while the queue is full (backpressure) but gives up once stop is set
+    while not stop.is_set():
+        try:
+            stage_queue.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+    raise PipelineStopped()
+
+
+def _drain(stage_queue, stop):
+    """Yields items from a stage queue until _DONE, re-raising a failed stage's error."""
+    while True:
+        try:
+            item = stage_queue.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                raise PipelineStopped()
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def _read_stage(path_to_html_files, pages, read_queue, stop):
+    try:
+        for page in pages:
+            _put(read_queue, (page, read_page(path_to_html_files, page)), stop)
+        _put(read_queue, _DONE, stop)
+    except PipelineStopped:
+        pass
+    except Exception as e:
+        try:
+            _put(read_queue, e, stop)
+        except PipelineStopped:
+            pass
+
+
+def parse_in_order(pages, workers=1, cache=None, backend="bs4", max_pending=None):
+    """
+    Turns (page, html) pairs into records in page order.
+
+    Cached records are reused; other pages are parsed in-process (workers=1) or on a
+    process pool with at most max_pending pages submitted and not yet written, so
+    the pool never runs more than that far ahead of the writer.
+    """
+    executor = None
+    if workers != 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    max_pending = max_pending or 2 * (workers or os.cpu_count())
+    pending = deque()
+
+    def resolve():
+        page, digest, record = pending.popleft()
+        parsed = isinstance(record, Future)
+        if parsed:
+            record = record.result()
+        if parsed and cache is not None:
+            cache.put(page, digest, record)
+        return record
+
+    try:
+        for page, html in pages:
+            digest = record = None
+            if cache is not None:
+                digest = content_hash(html)
+                record = cache.get(page, digest)
+            if record is None:
+                if executor is None:
+                    record = extract_record(html, backend)
+                    if cache is not None:
+                        cache.put(page, digest, record)
+                else:
+                    record = executor.submit(extract_record, html, backend)
+            pending.append((page, digest, record))
+            # Hand over everything that is ready at the head of the line
+            while pending and (
+                not isinstance(pending[0][2], Future)
+                or pending[0][2].done()
+                or len(pending) > max_pending
+            ):
+                yield resolve()
+        while pending:
+            yield resolve()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def run_pipeline(
+    path_to_html_files,
+    consume,
+    workers=1,
+    cache=None,
+    backend="bs4",
+    prefetch=32,
+    write_buffer=64,
+    max_pending=None,
+):
+    """
+    Builds every page's record through three overlapping stages:
+
+    - a reader thread prefetches up to `prefetch` pages from disk or a PageStore,
+    - the calling thread looks pages up in the cache and parses the rest, on a
+      process pool when workers != 1,
+    - a writer thread runs consume(records), e.g. write_term_banks, on the records
+      in page order, with up to `write_buffer` of them queued.
+
+    Every queue is bounded, so a slow stage holds back the ones before it and memory
+    stays flat however many pages there are. The cache is only touched from the
+    calling thread. An error in any stage stops the others and is re-raised here.
+    """
+    stop = threading.Event()
+    read_queue = queue.Queue(maxsize=prefetch)
+    write_queue = queue.Queue(maxsize=write_buffer)
+    writer_errors = []
+
+    def write_stage():
+        try:
+            consume(_drain(write_queue, stop))
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            writer_errors.append(e)
+            stop.set()
+
+    reader = threading.Thread(
+        target=_read_stage,
+        args=(path_to_html_files, list_pages(path_to_html_files), read_queue, stop),
+        name="page-reader",
+        daemon=True,
+    )
+    writer = threading.Thread(target=write_stage, name="term-bank-writer")
+    reader.start()
+    writer.start()
+    records = parse_in_order(_drain(read_queue, stop), workers, cache, backend, max_pending)
+    try:
+        for record in records:
+            _put(write_queue, record, stop)
+        _put(write_queue, _DONE, stop)
+    except PipelineStopped:
+        # The writer failed; its error is raised below
+        pass
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        # Shuts down the parser pool
+        records.close()
+        writer.join()
+        stop.set()
+        reader.join()
+    if writer_errors:
+        raise writer_errors[0]
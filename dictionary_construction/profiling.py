@@ -0,0 +1,139 @@
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class BuildProfiler:
+    """
+    Records wall time, CPU time and (optionally) allocations per build stage.
+
+    Stages tagged with a page are also totalled per page, allocations included, so
+    the slowest pages can be listed next to the per-stage totals. Stages must not
+    be nested: with trace_memory the allocation peak is reset at the start of
+    every stage.
+    """
+
+    def __init__(self, trace_memory=False, top_n=10):
+        self.trace_memory = trace_memory
+        self.top_n = top_n
+        self.stages = defaultdict(lambda: {"count": 0, "wall": 0.0, "cpu": 0.0})
+        self.pages = defaultdict(lambda: {"wall": 0.0, "cpu": 0.0, "stages": {}})
+        self._started_tracing = False
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+
+    def stop(self):
+        self.wall = time.perf_counter() - self.started
+        self.cpu = time.process_time() - self.started_cpu
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @contextmanager
+    def stage(self, name, page=None):
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        wall_before = time.perf_counter()
+        cpu_before = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_before
+            cpu = time.process_time() - cpu_before
+            totals = self.stages[name]
+            totals["count"] += 1
+            totals["wall"] += wall
+            totals["cpu"] += cpu
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                net_bytes = current - memory_before
+                peak_bytes = peak - memory_before
+                totals["net_bytes"] = totals.get("net_bytes", 0) + net_bytes
+                totals["peak_bytes"] = max(totals.get("peak_bytes", 0), peak_bytes)
+            if page is not None:
+                page_totals = self.pages[page]
+                page_totals["wall"] += wall
+                page_totals["cpu"] += cpu
+                page_totals["stages"][name] = page_totals["stages"].get(name, 0.0) + wall
+                if tracing:
+                    page_totals["net_bytes"] = page_totals.get("net_bytes", 0) + net_bytes
+                    page_totals["peak_bytes"] = max(page_totals.get("peak_bytes", 0), peak_bytes)
+
+    def time_methods(self, obj, names, page=None):
+        """
+        Shadows each named method on obj with a timed wrapper, so existing callers
+        (e.g. Dictionary_Entry.populate) are measured without changing them.
+        """
+        for name in names:
+            method = getattr(obj, name)
+
+            def timed(*args, _method=method, _name=name, **kwargs):
+                with self.stage(_name, page):
+                    return _method(*args, **kwargs)
+
+            setattr(obj, name, timed)
+
+    def slowest_pages(self, n=None) -> list:
+        n = self.top_n if n is None else n
+        ranked = sorted(self.pages.items(), key=lambda item: item[1]["wall"], reverse=True)
+        return [{"page": page, **totals} for page, totals in ranked[:n]]
+
+    def report(self) -> dict:
+        return {
+            "wall": getattr(self, "wall", None),
+            "cpu": getattr(self, "cpu", None),
+            "pages": len(self.pages),
+            "stages": dict(self.stages),
+            "slowest_pages": self.slowest_pages(),
+        }
+
+    def write_report(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, ensure_ascii=False, indent=4)
+
+    def print_summary(self):
+        pages = max(len(self.pages), 1)
+        overall = sum(totals["wall"] for totals in self.stages.values()) or 1.0
+        for name, totals in sorted(self.stages.items(), key=lambda item: -item[1]["wall"]):
+            line = (
+                f"{name:<20} {totals['wall']:8.3f}s wall {totals['cpu']:8.3f}s cpu "
+                f"{totals['wall'] / pages * 1000:8.3f} ms/page {totals['wall'] / overall * 100:5.1f}%"
+            )
+            if "peak_bytes" in totals:
+                line += f" peak {totals['peak_bytes'] / 1024 / 1024:7.1f} MB"
+            print(line)
+        for totals in self.slowest_pages():
+            line = f"{totals['wall'] * 1000:8.1f} ms"
+            if "peak_bytes" in totals:
+                line += f" peak {totals['peak_bytes'] / 1024 / 1024:7.1f} MB"
+            print(f"{line}  {totals['page']}")
+
+
+def run_with_cprofile(path, function, *args, **kwargs):
+    """
+    Runs function under cProfile, saves the stats to path and prints the top entries.
+    """
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(function, *args, **kwargs)
+    finally:
+        profile.dump_stats(path)
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(20)
@@ -0,0 +1,231 @@
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+try:
+    import orjson
+except ImportError:  # orjson is an optional speed-up, see the "fast" extra
+    orjson = None
+
+DEFAULT_MAX_BYTES = 1_000_000
+# Files a build writes into dictionary_files: the banks and index.json
+BUILD_FILE = re.compile(r"^(?:\w+_bank_\d+|index)\.json$")
+
+
+@contextmanager
+def staged_file(path):
+    """
+    Yields a temporary path next to path, which replaces path only if the block
+    finishes without an error; otherwise the previous file is left untouched.
+    """
+    staging = f"{path}.partial"
+    try:
+        yield staging
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+    os.replace(staging, path)
+
+
+@contextmanager
+def staged_directory(directory):
+    """
+    Yields an empty directory next to directory to build into. Only if the block
+    finishes without an error are the previous build's banks and index.json in
+    directory replaced by the new files; otherwise directory is left untouched.
+    """
+    directory = os.path.abspath(directory)
+    os.makedirs(directory, exist_ok=True)
+    staging = tempfile.mkdtemp(
+        dir=os.path.dirname(directory), prefix=f".{os.path.basename(directory)}-"
+    )
+    try:
+        yield staging
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    for name in os.listdir(directory):
+        if BUILD_FILE.match(name):
+            os.remove(os.path.join(directory, name))
+    for name in os.listdir(staging):
+        os.replace(os.path.join(staging, name), os.path.join(directory, name))
+    os.rmdir(staging)
+
+
+class TermBankWriter:
+    """
+    Streams entries into term_bank_{n}.json shards as they are produced.
+
+    A new shard is started whenever the current one would exceed max_bytes or already
+    holds max_entries entries, so only the entry being written is ever held in memory.
+    indent=None writes compact JSON, encoded with orjson when it is installed; any
+    other value matches json.dump(..., indent=indent) and always uses json, so the
+    default indent=4 never benefits from orjson (the CLIs' --compact sets indent=None).
+    digest is the SHA-256 of every entry as encoded, e.g. for index.json's revision.
+    """
+
+    def __init__(
+        self,
+        directory,
+        max_entries=None,
+        max_bytes=DEFAULT_MAX_BYTES,
+        indent=4,
+        prefix="term_bank",
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.indent = indent
+        self.prefix = prefix
+        self.shard_count = 0
+        self.entry_count = 0
+        self._shard = None
+        self._shard_entries = 0
+        self._shard_bytes = 0
+        self._digest = hashlib.sha256()
+        self._remove_stale_shards()
+
+    def _remove_stale_shards(self):
+        # Shards left over from a larger previous build would otherwise be zipped too
+        for path in glob.glob(os.path.join(self.directory, f"{self.prefix}_*.json")):
+            os.remove(path)
+
+    def _open_shard(self, name):
+        return open(os.path.join(self.directory, name), "wb")
+
+    def _encode(self, entry) -> bytes:
+        if self.indent is None:
+            if orjson is not None:
+                return orjson.dumps(entry)
+            return json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        text = json.dumps(entry, indent=self.indent, ensure_ascii=False)
+        padding = " " * self.indent
+        return "\n".join(padding + line for line in text.split("\n")).encode("utf-8")
+
+    @property
+    def _open_bracket(self) -> bytes:
+        return b"[" if self.indent is None else b"[\n"
+
+    @property
+    def _close_bracket(self) -> bytes:
+        return b"]" if self.indent is None else b"\n]"
+
+    @property
+    def _separator(self) -> bytes:
+        return b"," if self.indent is None else b",\n"
+
+    def _is_full(self, size: int) -> bool:
+        if self._shard is None:
+            return True
+        if self.max_entries is not None and self._shard_entries >= self.max_entries:
+            return True
+        if self.max_bytes is not None and self._shard_entries:
+            projected = (
+                self._shard_bytes + len(self._separator) + size + len(self._close_bracket)
+            )
+            return projected > self.max_bytes
+        return False
+
+    def _roll(self):
+        self._close_shard()
+        self.shard_count += 1
+        self._shard = self._open_shard(f"{self.prefix}_{self.shard_count}.json")
+        self._shard.write(self._open_bracket)
+        self._shard_entries = 0
+        self._shard_bytes = len(self._open_bracket)
+
+    def _close_shard(self):
+        if self._shard is None:
+            return
+        self._shard.write(self._close_bracket)
+        self._shard.close()
+        self._shard = None
+
+    def write(self, entry):
+        data = self._encode(entry)
+        if self._is_full(len(data)):
+            self._roll()
+        if self._shard_entries:
+            self._shard.write(self._separator)
+            self._shard_bytes += len(self._separator)
+        self._shard.write(data)
+        self._digest.update(data)
+        self._shard_bytes += len(data)
+        self._shard_entries += 1
+        self.entry_count += 1
+
+    @property
+    def digest(self) -> str:
+        return self._digest.hexdigest()
+
+    def write_all(self, entries):
+        for entry in entries:
+            self.write(entry)
+
+    def close(self):
+        self._close_shard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _BufferedShard(io.BytesIO):
+    """
+    In-memory shard that hands its bytes to on_close when it is closed.
+    """
+
+    def __init__(self, name, on_close):
+        super().__init__()
+        self.name = name
+        self.on_close = on_close
+
+    def close(self):
+        if not self.closed:
+            self.on_close(self.name, self.getvalue())
+        super().close()
+
+
+class ZipTermBankWriter(TermBankWriter):
+    """
+    TermBankWriter that writes shards straight into an open zipfile.ZipFile.
+
+    By default each shard is streamed through ZipFile.open(name, "w"), so nothing
+    touches dictionary_files. With parallel=True a finished shard is compressed on a
+    background thread while the next shard is being built. ZipFile only allows one
+    member to be written at a time, so shards are still deflated one after another.
+    """
+
+    def __init__(self, zip_file, parallel=False, **kwargs):
+        self.zip_file = zip_file
+        self._executor = ThreadPoolExecutor(max_workers=1) if parallel else None
+        self._pending = []
+        super().__init__(directory=None, **kwargs)
+
+    def _remove_stale_shards(self):
+        pass
+
+    def _open_shard(self, name):
+        if self._executor is None:
+            return self.zip_file.open(name, "w")
+        return _BufferedShard(name, self._submit)
+
+    def _submit(self, name, data):
+        self._pending.append(self._executor.submit(self.zip_file.writestr, name, data))
+
+    def close(self):
+        super().close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            for future in self._pending:
+                # Surface any error raised while compressing a shard
+                future.result()
@@ -0,0 +1,320 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import zipfile
+from array import array
+from dictionary_construction.const import JLPT, POS, SUBJECT
+
+MAGIC = b"BPTI"
+FORMAT_VERSION = 1
+DEFAULT_INDEX_FILENAME = "term_index.bin"
+
+# Every array in the file, in file order; each key table has a key array and a
+# postings array, each with its own offsets array
+TABLES = ["subject", "jlpt", "pos"]
+ARRAYS = ["body_offsets", "bodies"] + [
+    f"{table}_{part}"
+    for table in TABLES
+    for part in ["key_offsets", "keys", "posting_offsets", "postings"]
+]
+HEADER = struct.Struct("<4sI")
+DIRECTORY_ENTRY = struct.Struct("<QQ")
+OFFSET_PAIR = struct.Struct("<QQ")
+TERM_BANK_NAME = re.compile(r"^term_bank_(\d+)\.json$")
+
+
+def iter_term_bank_entries(source):
+    """
+    Yields every entry from the term_bank_{n}.json files in a directory or a
+    dictionary zip, in shard order.
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zipf:
+            names = [name for name in zipf.namelist() if TERM_BANK_NAME.match(name)]
+            names.sort(key=lambda name: int(TERM_BANK_NAME.match(name).group(1)))
+            for name in names:
+                yield from json.loads(zipf.read(name))
+        return
+
+    names = [name for name in os.listdir(source) if TERM_BANK_NAME.match(name)]
+    names.sort(key=lambda name: int(TERM_BANK_NAME.match(name).group(1)))
+    for name in names:
+        with open(os.path.join(source, name), "r", encoding="utf-8") as f:
+            yield from json.load(f)
+
+
+def subject_keys(subject: str) -> list:
+    """
+    The full subject plus each "・" variant, as split_and_duplicate_rows expands them.
+    """
+    keys = [subject]
+    for variant in subject.split("・"):
+        if variant and variant not in keys:
+            keys.append(variant)
+    return keys
+
+
+def _pack_table(postings: dict) -> list:
+    keys = sorted(key.encode("utf-8") for key in postings)
+    key_offsets = array("Q", [0])
+    posting_offsets = array("Q", [0])
+    ids = array("I")
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+        ids.extend(sorted(postings[key.decode("utf-8")]))
+        posting_offsets.append(len(ids))
+    return [key_offsets.tobytes(), b"".join(keys), posting_offsets.tobytes(), ids.tobytes()]
+
+
+def build_index(source, path=DEFAULT_INDEX_FILENAME) -> int:
+    """
+    Builds a term index file from the term banks in source (a directory or zip) and
+    returns the number of distinct entry bodies stored.
+
+    Entries are stored once each: the term bank output of json_generator repeats a
+    grammar point for every "・" variant, so entries are deduplicated on everything
+    but the subject. The first occurrence is kept and subject lookups swap in the
+    matched key.
+    """
+    body_ids = {}
+    body_offsets = array("Q", [0])
+    bodies = []
+    tables = {table: {} for table in TABLES}
+
+    for entry in iter_term_bank_entries(source):
+        fields = json.dumps(entry[1:], ensure_ascii=False, separators=(",", ":"))
+        body_id = body_ids.get(fields)
+        if body_id is None:
+            body_id = body_ids[fields] = len(bodies)
+            body = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            bodies.append(body)
+            body_offsets.append(body_offsets[-1] + len(body))
+        for key in subject_keys(entry[SUBJECT]):
+            tables["subject"].setdefault(key, set()).add(body_id)
+        tables["jlpt"].setdefault(entry[JLPT], set()).add(body_id)
+        for pos in entry[POS].split():
+            tables["pos"].setdefault(pos, set()).add(body_id)
+
+    arrays = [body_offsets.tobytes(), b"".join(bodies)]
+    for table in TABLES:
+        arrays.extend(_pack_table(tables[table]))
+
+    # Keep every array 8-byte aligned within the file
+    offset = HEADER.size + DIRECTORY_ENTRY.size * len(ARRAYS)
+    directory = []
+    for data in arrays:
+        offset += -offset % 8
+        directory.append((offset, len(data)))
+        offset += len(data)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION))
+        for entry in directory:
+            f.write(DIRECTORY_ENTRY.pack(*entry))
+        for (offset, _), data in zip(directory, arrays):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(data)
+    os.replace(temp_path, path)
+    return len(bodies)
+
+
+class _KeyTable:
+    """
+    Sorted keys and their posting lists, read in place from the mapped file.
+    UTF-8 byte order matches code point order, so prefixes are contiguous ranges.
+    """
+
+    def __init__(self, buffer, regions: dict, table: str):
+        self.buffer = buffer
+        self.key_offsets, size = regions[f"{table}_key_offsets"]
+        self.count = size // 8 - 1
+        self.keys = regions[f"{table}_keys"][0]
+        self.posting_offsets = regions[f"{table}_posting_offsets"][0]
+        self.postings = regions[f"{table}_postings"][0]
+
+    def __len__(self):
+        return self.count
+
+    def key(self, i) -> bytes:
+        start, end = OFFSET_PAIR.unpack_from(self.buffer, self.key_offsets + 8 * i)
+        return self.buffer[self.keys + start : self.keys + end]
+
+    def ids(self, i) -> tuple:
+        start, end = OFFSET_PAIR.unpack_from(self.buffer, self.posting_offsets + 8 * i)
+        return struct.unpack_from(f"<{end - start}I", self.buffer, self.postings + 4 * start)
+
+    def bisect(self, key: bytes) -> int:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find(self, key: bytes):
+        i = self.bisect(key)
+        if i < self.count and self.key(i) == key:
+            return i
+        return None
+
+    def iter_prefix(self, prefix: bytes):
+        i = self.bisect(prefix)
+        while i < self.count:
+            key = self.key(i)
+            if not key.startswith(prefix):
+                return
+            yield i, key
+            i += 1
+
+
+class TermIndex:
+    """
+    Read-only, memory-mapped view of a file written by build_index.
+
+    Opening the index maps the file and reads its directory, nothing else; keys are
+    binary-searched in place and entry bodies are only decoded when returned.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_FILENAME):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} term index.")
+
+        regions = {
+            name: DIRECTORY_ENTRY.unpack_from(self._map, HEADER.size + i * DIRECTORY_ENTRY.size)
+            for i, name in enumerate(ARRAYS)
+        }
+        self._body_offsets, size = regions["body_offsets"]
+        self._count = size // 8 - 1
+        self._bodies = regions["bodies"][0]
+        self.tables = {table: _KeyTable(self._map, regions, table) for table in TABLES}
+
+    def entry(self, body_id: int, subject=None) -> list:
+        """Decodes one stored entry, optionally under one of its subject variants."""
+        start, end = OFFSET_PAIR.unpack_from(self._map, self._body_offsets + 8 * body_id)
+        entry = json.loads(self._map[self._bodies + start : self._bodies + end])
+        if subject is not None:
+            entry[SUBJECT] = subject
+        return entry
+
+    def lookup(self, subject: str) -> list:
+        """Entries whose subject, or one of its "・" variants, is exactly subject."""
+        table = self.tables["subject"]
+        i = table.find(subject.encode("utf-8"))
+        if i is None:
+            return []
+        return [self.entry(body_id, subject) for body_id in table.ids(i)]
+
+    def prefix(self, prefix: str, limit=None) -> list:
+        """Entries whose subject or a variant starts with prefix, in key order."""
+        results = []
+        for i, key in self.tables["subject"].iter_prefix(prefix.encode("utf-8")):
+            subject = key.decode("utf-8")
+            for body_id in self.tables["subject"].ids(i):
+                if limit is not None and len(results) >= limit:
+                    return results
+                results.append(self.entry(body_id, subject))
+        return results
+
+    def _facet(self, table, value) -> list:
+        table = self.tables[table]
+        i = table.find(value.encode("utf-8"))
+        if i is None:
+            return []
+        return [self.entry(body_id) for body_id in table.ids(i)]
+
+    def by_jlpt(self, level: str) -> list:
+        return self._facet("jlpt", level)
+
+    def by_pos(self, part_of_speech: str) -> list:
+        return self._facet("pos", part_of_speech)
+
+    def __contains__(self, subject):
+        return self.tables["subject"].find(subject.encode("utf-8")) is not None
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def benchmark(index, queries, repeat=1000) -> dict:
+    """
+    Times key-only, exact and prefix queries; returns microseconds per query.
+    lookup and prefix include decoding the entries they return.
+    """
+    timings = {}
+    queries_by_name = [
+        ("contains", index.__contains__),
+        ("lookup", index.lookup),
+        ("prefix", lambda q: index.prefix(q, 10)),
+    ]
+    for name, query in queries_by_name:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for q in queries:
+                query(q)
+        timings[name] = (time.perf_counter() - start) / (repeat * len(queries)) * 1e6
+        print(f"{name}: {timings[name]:.1f} µs/query")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the term index.")
+    parser.add_argument(
+        "queries",
+        nargs="*",
+        help="Subjects to look up (prefixes with --prefix).",
+    )
+    parser.add_argument(
+        "--build",
+        metavar="SOURCE",
+        default=None,
+        help="Build the index from a term bank directory or dictionary zip first.",
+    )
+    parser.add_argument("--index", default=DEFAULT_INDEX_FILENAME, help="Index file.")
+    parser.add_argument("--prefix", action="store_true", help="Treat queries as prefixes.")
+    parser.add_argument("--jlpt", default=None, help="List the entries of a JLPT level.")
+    parser.add_argument("--pos", default=None, help="List the entries with a part of speech.")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Time the queries instead of printing their results.",
+    )
+    args = parser.parse_args()
+
+    if args.build:
+        count = build_index(args.build, args.index)
+        print(f"Indexed {count} entries into {args.index}")
+    with TermIndex(args.index) as index:
+        if args.benchmark:
+            benchmark(index, args.queries)
+        else:
+            results = []
+            for query in args.queries:
+                results += index.prefix(query) if args.prefix else index.lookup(query)
+            if args.jlpt:
+                results += index.by_jlpt(args.jlpt)
+            if args.pos:
+                results += index.by_pos(args.pos)
+            for entry in results:
+                print(json.dumps(entry, ensure_ascii=False))
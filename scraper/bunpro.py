@@ -1,43 +1,55 @@
 import json
 
 import time
-import random
 import datetime as dt
 import logging
 import os
+import sqlite3
 from collections import namedtuple
 from urllib.parse import quote
-import requests
-from bs4 import BeautifulSoup
-import tqdm
+from scraper.checkpoint import CrawlJournal
+from scraper.page_store import PageStore
 
+# requests, bs4 and tqdm are imported where they are used, so importing this
+# module (e.g. for ResponseResult or get_scrape_urls) stays cheap. The HTTP session
+# helpers live in scraper.session.
 
 
+# connect_time covers DNS lookup, TCP connect and TLS handshake; it is 0 when a
+# pooled keep-alive connection was reused. transfer_time is the rest of the request
+# and n_bytes the size of the response body.
 ResponseResult = namedtuple(
-    "ResponseResult", ["action", "site", "sleep_time", "scraped"]
+    "ResponseResult",
+    ["action", "site", "sleep_time", "scraped", "connect_time", "transfer_time", "n_bytes"],
+    defaults=(None, None, None),
 )
 
 
-# Create a logger
-logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
+def setup_logging(log_file="scraping_errors.log"):
+    """
+    Log info and above to the console and warnings and above to log_file.
+    Called by the scripts rather than on import, so importing never creates the file.
+    """
+    # Create a logger
+    logger = logging.getLogger()
+    logger.setLevel(logging.DEBUG)
 
-# Create a file handler for errors and warnings with UTF-8 encoding
-file_handler = logging.FileHandler("scraping_errors.log", encoding="utf-8")
-file_handler.setLevel(logging.WARNING)
+    # Create a file handler for errors and warnings with UTF-8 encoding
+    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    file_handler.setLevel(logging.WARNING)
 
-# Create a console handler to output to the console
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)  # Log info and above to console
+    # Create a console handler to output to the console
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)  # Log info and above to console
 
-# Create a logging format and add it to the handlers
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
+    # Create a logging format and add it to the handlers
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
 
-# Add the handlers to the logger
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+    # Add the handlers to the logger
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
 
 
 def get_scrape_urls(json_path: str, n_level: str) -> list:
@@ -63,37 +75,6 @@ def get_scrape_urls(json_path: str, n_level: str) -> list:
     return scrape_sites
 
 
-def gen_random_sleeps(min_sleep, max_total_time, n_requests):
-    """Generate random sleep intervals for web scraping."""
-    if n_requests * min_sleep > max_total_time:
-        error_msg = (
-            "Minimum sleep times number of requests exceed the maximum total time."
-        )
-        logging.error(error_msg)
-        raise ValueError(error_msg)
-
-    remaining_time = max_total_time - (n_requests * min_sleep)
-    sleep_intervals = [min_sleep] * n_requests
-
-    for i in range(n_requests):
-        if remaining_time <= 0:
-            break
-        max_additional_sleep = remaining_time / (n_requests - i)
-        additional_sleep = random.uniform(0, max_additional_sleep)
-        sleep_intervals[i] += additional_sleep
-        remaining_time -= additional_sleep
-
-    if len(sleep_intervals) != n_requests:
-        error_msg = (
-            f"Error generating sleep intervals: {len(sleep_intervals)} != {n_requests}"
-        )
-        logging.error(error_msg)
-        raise ValueError(error_msg)
-
-    random.shuffle(sleep_intervals)
-    return sleep_intervals
-
-
 def calc_duration(start=None, end=None):
     """Calculate the duration between two datetime objects."""
     if start is None:
@@ -109,14 +90,24 @@ def calc_duration(start=None, end=None):
 
 
 # save source code to a file
-def save_source_code(soup, site):
-    """Save the source code of a webpage to a file."""
-    filename = site.split("/")[-1] + ".html"
+def get_grammar_pages_dir():
+    """Return the path of the 'grammar_pages' directory next to the scraper package."""
     dir = os.path.dirname(
         os.path.abspath(__file__)
     )  # Get the directory of the current file
     parent_dir = os.path.join(dir, os.pardir)  # Navigate to the parent directory
-    grammar_pages_dir = os.path.join(parent_dir, "grammar_pages")
+    return os.path.join(parent_dir, "grammar_pages")
+
+
+def page_filename(site):
+    """Return the file name a site is saved under."""
+    return site.split("/")[-1] + ".html"
+
+
+def save_source_code(soup, site, overwrite=False, pages_dir=None):
+    """Save the source code of a webpage to a file in pages_dir (grammar_pages by default)."""
+    filename = page_filename(site)
+    grammar_pages_dir = pages_dir or get_grammar_pages_dir()
 
     # Check if 'grammar_pages' directory exists, if not, create it
     if not os.path.exists(grammar_pages_dir):
@@ -127,7 +118,7 @@ def save_source_code(soup, site):
     filename = os.path.join(grammar_pages_dir, filename)
 
     # check if the file already exists
-    if os.path.exists(filename):
+    if os.path.exists(filename) and not overwrite:
         # if it does, add a timestamp to the filename
         timestamp = dt.datetime.now().strftime("%Y%m%d%H%M%S")
         filename = f"{filename}_{timestamp}.html"
@@ -139,16 +130,39 @@ def save_source_code(soup, site):
         logging.error(f"Error saving source code for {site}: {e}")
 
 
-def process_response(response, site, sleep_time):
+def save_response(response, site, overwrite=False, pages_dir=None):
+    """Parse a fetched page and save it alongside the other grammar pages."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(response.text, "html.parser")
+    save_source_code(soup, site, overwrite, pages_dir)
+
+
+def store_saver(store: PageStore):
+    """
+    Return a save_page callable that keeps the raw response bytes in a PageStore
+    instead of parsing and prettifying them into grammar_pages.
+    """
+
+    def save_to_store(response, site):
+        try:
+            store.put(page_filename(site), response.content, url=site)
+        except sqlite3.Error as e:
+            logging.error(f"Error saving {site} to page store: {e}")
+
+    return save_to_store
+
+
+def process_response(response, site, sleep_time, save_page=save_response):
+    import requests
+
     try:
         response.raise_for_status()
         if response.status_code == 429:
             logging.error(f"Rate limit exceeded for {site}. Exiting.")
             return ResponseResult("break", site, sleep_time, False)
 
-        time.sleep(sleep_time)
-        soup = BeautifulSoup(response.text, "html.parser")
-        save_source_code(soup, site)
+        save_page(response, site)
 
         return ResponseResult("scrape", site, sleep_time, True)
 
@@ -160,88 +174,136 @@ def process_response(response, site, sleep_time):
         return ResponseResult("error", site, sleep_time, False)
 
 
-def scrape_sites(sites, times, min_session_interval):
-    sites_times = zip(sites, times)
-    session = None
-    skip_sites = os.listdir("../grammar_pages")
-    skip_sites = [site.split(".")[0] for site in skip_sites]
+def scrape_sites(
+    sites, scheduler=None, session=None, save_page=save_response, journal=None, store=None
+):
+    """
+    Scrape sites one at a time, paced by an AdaptiveScheduler.
+
+    The scheduler decides the delay before each request from the latency, errors
+    and 429s seen so far; by default the crawl is spread until midnight with 2 to
+    60 seconds between requests.
+
+    All requests share one pooled session, so connections are reused across the
+    whole crawl instead of paying a new TCP/TLS handshake per page. When a
+    CrawlJournal is given every result is checkpointed to it as it happens, and
+    sites it already records as done are skipped. Sites already saved in
+    grammar_pages, or in store when pages are kept in a PageStore, are skipped too.
+    """
+    import requests
+    import tqdm
+    from scraper.fetch_engine import parse_retry_after
+    from scraper.scheduler import AdaptiveScheduler
+    from scraper.session import create_session, timed_get
+
+    if scheduler is None:
+        scheduler = AdaptiveScheduler(len(sites), calc_duration())
+    own_session = session is None
+    if own_session:
+        session = create_session()
+    grammar_pages_dir = get_grammar_pages_dir()
+    skip_sites = set()
+    if os.path.isdir(grammar_pages_dir):
+        skip_sites = {site.split(".")[0] for site in os.listdir(grammar_pages_dir)}
+    total_connect = total_transfer = 0.0
 
     try:
-        for site, sleep_time in tqdm.tqdm(
-            sites_times,
+        for site in tqdm.tqdm(
+            sites,
             total=len(sites),
             desc="Scraping sites",
             bar_format="{l_bar}{bar} | {n_fmt}/{total_fmt} sites",
             leave=True,
         ):
 
-            if site.split("/")[-1] in skip_sites:
+            if (
+                site.split("/")[-1] in skip_sites
+                or (store is not None and page_filename(site) in store)
+                or (journal is not None and journal.is_done(site))
+            ):
                 logging.info(f"Skipping {site} as it has already been scraped.")
+                scheduler.skip()
                 continue
 
             # Encode the URL properly
             encoded_site = quote(site, safe=":/?=&")
+            sleep_time = scheduler.wait()
+            started = time.perf_counter()
 
             try:
-                if sleep_time < min_session_interval:
-                    # Use a session for requests with short sleep times
-                    if session is None:
-                        session = requests.Session()
-                    response = session.get(encoded_site, timeout=10)
-                else:
-                    # Use a direct request for longer sleep times
-                    if session is not None:
-                        session.close()
-                        session = None
-                    response = requests.get(encoded_site, timeout=10)
-
-                result = process_response(response, site, sleep_time)
+                response = timed_get(session, encoded_site, timeout=10)
+                scheduler.observe(
+                    time.perf_counter() - started,
+                    response.status_code,
+                    parse_retry_after(response.headers.get("Retry-After")),
+                )
+                total_connect += response.connect_time
+                total_transfer += response.transfer_time
+                logging.debug(
+                    f"Fetched {site}: connect {response.connect_time:.3f}s, "
+                    f"transfer {response.transfer_time:.3f}s"
+                )
+
+                result = process_response(response, site, sleep_time, save_page)
+                result = result._replace(
+                    connect_time=response.connect_time,
+                    transfer_time=response.transfer_time,
+                    n_bytes=len(response.content),
+                )
                 logging.debug(f"Processed response from {site}")
-                if result.action == "break":
-                    break
-                yield result
 
             except requests.exceptions.Timeout:
                 logging.error(f"Timeout occurred while trying to access {site}")
-                yield ResponseResult("error", site, sleep_time, False)
+                scheduler.observe(time.perf_counter() - started)
+                result = ResponseResult("error", site, sleep_time, False)
             except requests.exceptions.RequestException as e:
                 logging.error(f"Error scraping {site}: {e}")
-                yield ResponseResult("error", site, sleep_time, False)
-            finally:
-                if session is not None and sleep_time >= min_session_interval:
-                    session.close()
-                    session = None
-                    logging.debug("Session closed")
+                scheduler.observe(time.perf_counter() - started)
+                result = ResponseResult("error", site, sleep_time, False)
+
+            if journal is not None:
+                journal.record(result)
+            if result.action == "break":
+                break
+            yield result
 
     except KeyboardInterrupt:
         logging.info("Scraping interrupted by user.")
-        if session is not None:
-            session.close()
-            logging.info("Session closed after interruption.")
         raise  # Re-raise the exception if needed
 
-    # Ensure the session is closed if it was opened
-    if session is not None:
-        session.close()
+    finally:
+        logging.info(
+            f"Time spent connecting: {total_connect:.2f}s, transferring: {total_transfer:.2f}s"
+        )
+        if own_session:
+            session.close()
+            logging.debug("Session closed")
 
 
 if __name__ == "__main__":
+    from scraper.scheduler import AdaptiveScheduler
+    from scraper.session import create_session
+
+    setup_logging()
     JSON_PATH = "grammar_points.json"
     N_LEVEL = "N1"
     sites_to_scrape_list = get_scrape_urls(JSON_PATH, N_LEVEL)
     MIN_SLEEP = 2  # seconds
-    duration = calc_duration()
-    n_requests = len(sites_to_scrape_list)
-    sleep_times = [random.randint(MIN_SLEEP, 10) for _ in range(n_requests)]
-    MIN_SESSION_INTERVAL = 30  # seconds
-
-    # Collect results from the generator
-    results = list(
-        scrape_sites(sites_to_scrape_list, sleep_times, MIN_SESSION_INTERVAL)
+    MAX_SLEEP = 10  # seconds
+    # Spread the crawl until midnight, backing off when the server struggles
+    scheduler = AdaptiveScheduler(
+        len(sites_to_scrape_list), calc_duration(), MIN_SLEEP, MAX_SLEEP
     )
-
-    # Save the results list to a file
-    with open("scrape_results.json", "w", encoding="utf-8") as f:
-        json.dump(
-            [result._asdict() for result in results], f, ensure_ascii=False, indent=4
-        )
+    POOL_SIZE = 4
+
+    # Every result is checkpointed to the journal as it happens, so rerunning after
+    # a crash resumes where it stopped and only retries failed sites
+    with create_session(pool_size=POOL_SIZE) as session, CrawlJournal(
+        "scrape_journal.jsonl"
+    ) as journal:
+        for _ in scrape_sites(sites_to_scrape_list, scheduler, session, journal=journal):
+            pass
+
+        # Save the results list to a file
+        with open("scrape_results.json", "w", encoding="utf-8") as f:
+            json.dump(journal.results(), f, ensure_ascii=False, indent=4)
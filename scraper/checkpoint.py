@@ -0,0 +1,69 @@
+import datetime as dt
+import json
+import logging
+import os
+
+# Actions that mean a site does not need to be fetched again
+COMPLETED_ACTIONS = {"scrape", "not_modified"}
+
+
+class CrawlJournal:
+    """
+    Append-only JSONL journal of every URL a crawl has attempted.
+
+    Each result is written and flushed as soon as it is produced, so a crashed or
+    interrupted crawl loses at most the request that was in flight. On restart the
+    journal is replayed into a dict keyed by site; the latest entry wins, so sites that
+    failed earlier are retried and sites that succeeded are skipped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._load()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a partially written last line
+                    logging.warning(f"Ignoring corrupt line {line_number} in {self.path}")
+                    continue
+                self.entries[entry["site"]] = entry
+
+    def record(self, result):
+        entry = result._asdict()
+        entry["recorded_at"] = dt.datetime.now().isoformat(timespec="seconds")
+        self.entries[result.site] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def is_done(self, site) -> bool:
+        entry = self.entries.get(site)
+        return entry is not None and entry["action"] in COMPLETED_ACTIONS
+
+    @property
+    def completed(self) -> set:
+        return {site for site in self.entries if self.is_done(site)}
+
+    @property
+    def failed(self) -> set:
+        return {site for site in self.entries if not self.is_done(site)}
+
+    def results(self) -> list:
+        return list(self.entries.values())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,206 @@
+import asyncio
+import datetime as dt
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
+import requests
+from scraper.bunpro import ResponseResult, save_response
+from scraper.session import create_session, timed_get
+
+
+class TokenBucket:
+    """
+    Global rate limiter shared by every request in flight.
+
+    Tokens refill at `rate` per second up to `burst`; each request takes one.
+    pause() empties the bucket and blocks all callers, which is how a 429's
+    Retry-After is applied to the whole crawl rather than to a single request.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1.")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def pause(self, seconds):
+        now = self.clock()
+        self._refill(now)
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    async def acquire(self) -> float:
+        """Wait for a token and return how long the caller was held back."""
+        started = self.clock()
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self._refill(now)
+                if now < self.blocked_until:
+                    delay = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - started
+                else:
+                    delay = (1 - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds requested by a Retry-After header, if any."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+async def fetch_site(session, bucket, site, max_retries=3, timeout=10, save_page=save_response):
+    """Fetch and save a single site, retrying 429s after the server's Retry-After."""
+    encoded_site = quote(site, safe=":/?=&")
+    waited = 0.0
+    for attempt in range(max_retries + 1):
+        waited += await bucket.acquire()
+        try:
+            response = await asyncio.to_thread(timed_get, session, encoded_site, timeout=timeout)
+        except requests.exceptions.Timeout:
+            logging.error(f"Timeout occurred while trying to access {site}")
+            return ResponseResult("error", site, waited, False)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error scraping {site}: {e}")
+            return ResponseResult("error", site, waited, False)
+
+        if response.status_code == 429:
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            if delay is None:
+                delay = 2 ** attempt
+            logging.warning(f"Rate limited on {site}, pausing all requests for {delay:.1f}s.")
+            bucket.pause(delay)
+            continue
+
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as http_err:
+            logging.error(f"HTTP error occurred while scraping {site}: {http_err}")
+            return ResponseResult("error", site, waited, False)
+
+        await asyncio.to_thread(save_page, response, site)
+        return ResponseResult(
+            "scrape",
+            site,
+            waited,
+            True,
+            response.connect_time,
+            response.transfer_time,
+            len(response.content),
+        )
+
+    logging.error(f"Rate limit exceeded for {site} after {max_retries} retries.")
+    return ResponseResult("break", site, waited, False)
+
+
+async def fetch_sites(
+    sites,
+    rate=0.5,
+    burst=1,
+    concurrency=4,
+    max_retries=3,
+    timeout=10,
+    session=None,
+    save_page=save_response,
+):
+    """
+    Fetch sites with up to `concurrency` requests in flight under one TokenBucket.
+
+    sites can be any iterable, including one that blocks while more URLs are being
+    discovered (such as a CrawlFrontier); it is advanced on a worker thread so the
+    event loop keeps running. Yields a ResponseResult per site in completion order.
+    The sleep_time field holds the time the request spent waiting on the rate limiter.
+
+    As in scrape_sites, a "break" result (a site still rate limited after
+    max_retries) ends the crawl: no further sites are started, and requests
+    already in flight are finished and yielded.
+    """
+    site_iter = iter(sites)
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=concurrency)
+    bucket = TokenBucket(rate, burst)
+    # Iterators are not safe to advance from two threads at once
+    next_lock = asyncio.Lock()
+    results = asyncio.Queue()
+    stopping = asyncio.Event()
+
+    async def next_site():
+        async with next_lock:
+            return await asyncio.to_thread(next, site_iter, None)
+
+    async def worker():
+        try:
+            while not stopping.is_set() and (site := await next_site()) is not None:
+                try:
+                    result = await fetch_site(
+                        session, bucket, site, max_retries, timeout, save_page
+                    )
+                except Exception as e:
+                    # e.g. save_page failing; report the site instead of losing it
+                    logging.exception(f"Error processing {site}: {e}")
+                    result = ResponseResult("error", site, 0.0, False)
+                if result.action == "break":
+                    stopping.set()
+                await results.put(result)
+        except Exception as e:
+            # The sites iterable itself failed; the consumer re-raises it
+            await results.put(e)
+        finally:
+            # Tells the consumer this worker has finished
+            await results.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        running = len(workers)
+        while running:
+            result = await results.get()
+            if result is None:
+                running -= 1
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                yield result
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if own_session:
+            session.close()
+
+
+def scrape_sites_concurrently(sites, **kwargs):
+    """Synchronous wrapper around fetch_sites for callers of scrape_sites."""
+    loop = asyncio.new_event_loop()
+    results = fetch_sites(sites, **kwargs)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
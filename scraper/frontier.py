@@ -0,0 +1,299 @@
+import argparse
+import datetime as dt
+import heapq
+import itertools
+import json
+import logging
+import os
+import re
+import threading
+from functools import partial
+from urllib.parse import urljoin
+from scraper.bunpro import (
+    get_grammar_pages_dir,
+    page_filename,
+    save_response,
+    setup_logging,
+    store_saver,
+)
+from scraper.checkpoint import CrawlJournal
+
+ALL_LEVELS = ["N5", "N4", "N3", "N2", "N1", "Non-JLPT"]
+JOURNAL_PATH = "frontier_journal.jsonl"
+BASE_URL = "https://bunpro.jp"
+# Links on an index page that point at a grammar point
+GRAMMAR_LINK = re.compile(r"^(?:https://bunpro\.jp)?/grammar_points/[^/?#]+$")
+
+
+def load_level_urls(json_path, levels=ALL_LEVELS):
+    """
+    Yield (level, url) for every grammar point of the given levels in
+    grammar_points.json, reading the file once.
+    """
+    try:
+        with open(json_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        logging.error(f"JSON file {json_path} not found.")
+        return
+    except json.JSONDecodeError:
+        logging.error(f"Error decoding JSON from {json_path}.")
+        return
+
+    for level in levels:
+        for grammar_point in data.get(level, []):
+            for url in grammar_point.values():
+                yield level, BASE_URL + url
+
+
+def discover_grammar_urls(session, index_url, timeout=10) -> list:
+    """Fetch an index page and return the grammar point URLs it links to, in page order."""
+    from bs4 import BeautifulSoup
+
+    response = session.get(index_url, timeout=timeout)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+    urls = []
+    for link in soup.find_all("a", href=True):
+        if GRAMMAR_LINK.match(link["href"]):
+            url = urljoin(BASE_URL, link["href"])
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def directory_fetch_times(pages_dir=None):
+    """
+    Return a last_fetched callable backed by the saved pages in grammar_pages,
+    using each file's modification time.
+    """
+    if pages_dir is None:
+        pages_dir = get_grammar_pages_dir()
+
+    def last_fetched(site):
+        try:
+            return os.path.getmtime(os.path.join(pages_dir, page_filename(site)))
+        except OSError:
+            return None
+
+    return last_fetched
+
+
+def store_fetch_times(store):
+    """Return a last_fetched callable backed by the fetched_at column of a PageStore."""
+    fetched = store.fetched_times()
+
+    def last_fetched(site):
+        return fetched.get(page_filename(site))
+
+    return last_fetched
+
+
+class CrawlFrontier:
+    """
+    Deduplicated, stale-first queue of URLs shared by every level of a crawl.
+
+    Sites never fetched come first, then the rest from the oldest fetch onwards;
+    ties keep insertion order. URLs can be added from several threads (e.g. one
+    per index page being discovered) while a fetcher iterates over the frontier;
+    iteration blocks while the frontier is empty and ends once it is closed.
+    """
+
+    def __init__(self, last_fetched=None, min_age=None, exclude=None):
+        """
+        last_fetched(site) returns when a site was last saved (epoch seconds) or None.
+        Sites saved less than min_age seconds ago, or for which exclude(site) is true
+        (e.g. CrawlJournal.is_done), are not queued.
+        """
+        self.last_fetched = last_fetched or (lambda site: None)
+        self.min_age = min_age
+        self.exclude = exclude
+        self.levels = {}
+        self._heap = []
+        self._order = itertools.count()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def add(self, site, level=None) -> bool:
+        """Queue site unless it was seen before; returns whether it was queued."""
+        with self._condition:
+            if site in self.levels:
+                if level is not None:
+                    self.levels[site].add(level)
+                return False
+            self.levels[site] = {level} if level is not None else set()
+
+        if self.exclude is not None and self.exclude(site):
+            return False
+        fetched = self.last_fetched(site)
+        if (
+            fetched is not None
+            and self.min_age is not None
+            and dt.datetime.now().timestamp() - fetched < self.min_age
+        ):
+            return False
+        # Never-fetched sites sort before everything else
+        priority = float("-inf") if fetched is None else fetched
+        with self._condition:
+            heapq.heappush(self._heap, (priority, next(self._order), site))
+            self._condition.notify()
+        return True
+
+    def add_all(self, sites, level=None) -> int:
+        return sum(self.add(site, level) for site in sites)
+
+    def close(self):
+        """No more sites will be added; iteration ends once the queue is empty."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def pop(self):
+        """Return the stalest queued site, waiting for one; None once closed and empty."""
+        with self._condition:
+            while not self._heap and not self._closed:
+                self._condition.wait()
+            if not self._heap:
+                return None
+            return heapq.heappop(self._heap)[2]
+
+    def __iter__(self):
+        while (site := self.pop()) is not None:
+            yield site
+
+    def __len__(self):
+        with self._condition:
+            return len(self._heap)
+
+
+def discover_into(frontier, session, index_urls, close=True) -> threading.Thread:
+    """
+    Discover grammar URLs from index pages on a background thread, adding each
+    page's links to frontier as soon as it is parsed, so fetching starts right away.
+    index_urls maps a level to its index page URL.
+    """
+
+    def discover():
+        try:
+            for level, index_url in index_urls.items():
+                try:
+                    urls = discover_grammar_urls(session, index_url)
+                except Exception as e:
+                    logging.error(f"Error discovering grammar points from {index_url}: {e}")
+                    continue
+                added = frontier.add_all(urls, level)
+                logging.info(f"Discovered {len(urls)} grammar points for {level}, {added} new.")
+        finally:
+            if close:
+                frontier.close()
+
+    thread = threading.Thread(target=discover, name="frontier-discovery", daemon=True)
+    thread.start()
+    return thread
+
+
+def crawl(
+    level_sites,
+    journal_path=JOURNAL_PATH,
+    last_fetched=None,
+    min_age=None,
+    index_urls=None,
+    session=None,
+    save_page=None,
+    pages_dir=None,
+    **fetch_kwargs,
+) -> list:
+    """
+    Crawls (level, site) pairs, plus anything discovered from index_urls, through a
+    CrawlFrontier and returns this run's results.
+
+    The journal at journal_path belongs to a single run: a crawl that is interrupted
+    or cut short by a "break" resumes from it and skips the sites it already
+    completed, and it is removed once a crawl finishes, so the next run starts over
+    and re-fetches every site that is older than min_age. By default pages are
+    saved over the previous copy in pages_dir.
+    """
+    from scraper.fetch_engine import scrape_sites_concurrently
+    from scraper.session import create_session
+
+    if last_fetched is None:
+        last_fetched = directory_fetch_times(pages_dir)
+    if save_page is None:
+        save_page = partial(save_response, overwrite=True, pages_dir=pages_dir)
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=fetch_kwargs.get("concurrency", 4))
+    results = []
+    try:
+        with CrawlJournal(journal_path) as journal:
+            frontier = CrawlFrontier(last_fetched, min_age=min_age, exclude=journal.is_done)
+            for level, site in level_sites:
+                frontier.add(site, level)
+            if index_urls:
+                discover_into(frontier, session, index_urls)
+            else:
+                frontier.close()
+
+            logging.info(f"{len(frontier)} sites queued.")
+            for result in scrape_sites_concurrently(
+                frontier, session=session, save_page=save_page, **fetch_kwargs
+            ):
+                journal.record(result)
+                results.append(result)
+    finally:
+        if own_session:
+            session.close()
+    if not any(result.action == "break" for result in results):
+        os.remove(journal_path)
+    return results
+
+
+if __name__ == "__main__":
+    from scraper.page_store import PageStore
+    from scraper.session import create_session
+
+    parser = argparse.ArgumentParser(
+        description="Crawl every JLPT level in one run, stalest pages first."
+    )
+    parser.add_argument("--levels", nargs="+", default=ALL_LEVELS, help="Levels to crawl.")
+    parser.add_argument(
+        "--index",
+        nargs=2,
+        action="append",
+        metavar=("LEVEL", "URL"),
+        default=[],
+        help="Also discover grammar points of LEVEL from the index page at URL.",
+    )
+    parser.add_argument(
+        "--min-age",
+        type=float,
+        default=None,
+        help="Skip pages saved fewer than this many seconds ago.",
+    )
+    parser.add_argument("--rate", type=float, default=0.5, help="Requests per second.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight.")
+    parser.add_argument(
+        "--page-store",
+        default=None,
+        help="Save pages to this PageStore and take fetch times from it.",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    store = PageStore(args.page_store) if args.page_store else None
+    with create_session(pool_size=args.concurrency) as session:
+        results = crawl(
+            load_level_urls("grammar_points.json", args.levels),
+            last_fetched=store_fetch_times(store) if store else None,
+            min_age=args.min_age,
+            index_urls=dict(args.index),
+            session=session,
+            save_page=store_saver(store) if store else None,
+            rate=args.rate,
+            concurrency=args.concurrency,
+        )
+    if store:
+        store.close()
+
+    with open("scrape_results.json", "w", encoding="utf-8") as f:
+        json.dump([result._asdict() for result in results], f, ensure_ascii=False, indent=4)
@@ -0,0 +1,115 @@
+import datetime as dt
+import os
+import sqlite3
+import threading
+import zlib
+
+DEFAULT_STORE_FILENAME = "grammar_pages.sqlite"
+
+
+class PageStore:
+    """
+    Compressed store of raw page bytes, kept as zlib blobs in a single SQLite file.
+
+    Pages are keyed by the same file name the scraper uses for grammar_pages
+    (e.g. "%E3%81%A0.html"), so the store can stand in for the directory. Saving a
+    page that already exists replaces it instead of creating a timestamped copy.
+    """
+
+    def __init__(self, path, compresslevel=6):
+        self.path = path
+        self.compresslevel = compresslevel
+        # The fetch engine saves pages from worker threads
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                name TEXT PRIMARY KEY,
+                url TEXT,
+                fetched_at TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )
+            """
+        )
+
+    def _insert(self, name, data: bytes, url):
+        compressed = zlib.compress(data, self.compresslevel)
+        fetched_at = dt.datetime.now().isoformat(timespec="seconds")
+        self.connection.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+            (name, url, fetched_at, len(data), compressed),
+        )
+
+    def put(self, name, data: bytes, url=None):
+        # Committed per page so an interrupted crawl keeps everything saved so far
+        with self._lock:
+            self._insert(name, data, url)
+            self.connection.commit()
+
+    def get(self, name) -> bytes:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT data FROM pages WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return zlib.decompress(row[0])
+
+    def read_text(self, name) -> str:
+        # Match reading a saved page in text mode, which translates newlines
+        text = self.get(name).decode("utf-8")
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    def names(self) -> list:
+        with self._lock:
+            rows = self.connection.execute("SELECT name FROM pages ORDER BY name").fetchall()
+        return [name for (name,) in rows]
+
+    def fetched_times(self) -> dict:
+        """Map each stored page name to when it was fetched, as epoch seconds."""
+        with self._lock:
+            rows = self.connection.execute("SELECT name, fetched_at FROM pages").fetchall()
+        return {name: dt.datetime.fromisoformat(at).timestamp() for name, at in rows}
+
+    def __contains__(self, name):
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM pages WHERE name = ?", (name,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def import_directory(self, directory) -> int:
+        """Copy every saved .html page from a grammar_pages directory into the store."""
+        count = 0
+        with self._lock:
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".html"):
+                    continue
+                with open(os.path.join(directory, name), "rb") as file:
+                    self._insert(name, file.read(), None)
+                count += 1
+            self.connection.commit()
+        return count
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == "__main__":
+    # Migrate the existing grammar_pages directory into a page store
+    with PageStore(os.path.join(os.pardir, DEFAULT_STORE_FILENAME)) as store:
+        imported = store.import_directory(os.path.join(os.pardir, "grammar_pages"))
+        print(f"Imported {imported} pages into {store.path}")
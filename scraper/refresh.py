@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import time
+from functools import partial
+from urllib.parse import quote
+import requests
+import tqdm
+from scraper.bunpro import (
+    ResponseResult,
+    get_grammar_pages_dir,
+    get_scrape_urls,
+    save_response,
+    setup_logging,
+)
+from scraper.session import create_session, timed_get
+
+INDEX_FILENAME = "refresh_index.json"
+
+
+def default_index_path(pages_dir):
+    """
+    The validator index lives next to the pages directory, not inside it, so the
+    builds that read every file in grammar_pages only ever see pages.
+    """
+    parent = os.path.dirname(os.path.abspath(pages_dir))
+    return os.path.join(parent, INDEX_FILENAME)
+
+
+def load_validators(index_path):
+    """Load the ETag/Last-Modified validators saved by the previous refresh."""
+    try:
+        with open(index_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        logging.error(f"Error decoding JSON from {index_path}. Starting a fresh index.")
+        return {}
+
+
+def save_validators(index_path, validators):
+    """Write the validator index atomically so an interrupted refresh cannot corrupt it."""
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(validators, file, ensure_ascii=False, indent=4)
+    os.replace(temp_path, index_path)
+
+
+def conditional_headers(validator):
+    headers = {}
+    if validator.get("etag"):
+        headers["If-None-Match"] = validator["etag"]
+    if validator.get("last_modified"):
+        headers["If-Modified-Since"] = validator["last_modified"]
+    return headers
+
+
+def refresh_sites(
+    sites, session=None, pages_dir=None, min_interval=1.0, save_page=None, index_path=None
+):
+    """
+    Re-fetch sites with conditional GETs and only re-save pages that changed.
+
+    Each site's ETag and Last-Modified are kept in index_path, by default
+    refresh_index.json next to the pages directory. A 304 Not Modified is yielded as
+    a "not_modified" ResponseResult without parsing or writing anything; a 200
+    overwrites the page saved in pages_dir in place.
+    """
+    if pages_dir is None:
+        pages_dir = get_grammar_pages_dir()
+    if save_page is None:
+        save_page = partial(save_response, overwrite=True, pages_dir=pages_dir)
+    if index_path is None:
+        index_path = default_index_path(pages_dir)
+    os.makedirs(pages_dir, exist_ok=True)
+    own_session = session is None
+    if own_session:
+        session = create_session()
+    validators = load_validators(index_path)
+
+    try:
+        for site in tqdm.tqdm(
+            sites,
+            total=len(sites),
+            desc="Refreshing sites",
+            bar_format="{l_bar}{bar} | {n_fmt}/{total_fmt} sites",
+            leave=True,
+        ):
+            encoded_site = quote(site, safe=":/?=&")
+            headers = conditional_headers(validators.get(site, {}))
+            try:
+                response = timed_get(session, encoded_site, headers=headers, timeout=10)
+                stats = (
+                    response.connect_time, response.transfer_time, len(response.content)
+                )
+                if response.status_code == 304:
+                    logging.debug(f"{site} has not been modified.")
+                    yield ResponseResult("not_modified", site, min_interval, False, *stats)
+                elif response.status_code == 429:
+                    logging.error(f"Rate limit exceeded for {site}. Exiting.")
+                    break
+                else:
+                    response.raise_for_status()
+                    save_page(response, site)
+                    validators[site] = {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                    yield ResponseResult("scrape", site, min_interval, True, *stats)
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error refreshing {site}: {e}")
+                yield ResponseResult("error", site, min_interval, False)
+            time.sleep(min_interval)
+    finally:
+        save_validators(index_path, validators)
+        if own_session:
+            session.close()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    JSON_PATH = "grammar_points.json"
+    N_LEVELS = ["N5", "N4", "N3", "N2", "N1"]
+    sites_to_refresh = [
+        site for n_level in N_LEVELS for site in get_scrape_urls(JSON_PATH, n_level)
+    ]
+
+    results = list(refresh_sites(sites_to_refresh, min_interval=2))
+
+    with open("refresh_results.json", "w", encoding="utf-8") as f:
+        json.dump(
+            [result._asdict() for result in results], f, ensure_ascii=False, indent=4
+        )
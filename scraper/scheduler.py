@@ -0,0 +1,265 @@
+import argparse
+import logging
+import random
+import time
+from collections import namedtuple
+
+# One simulated request: when it was sent, the delay before it and how it went
+ScheduleStep = namedtuple("ScheduleStep", ["sent_at", "delay", "latency", "status"])
+
+
+class SimulatedClock:
+    """
+    Stands in for time.monotonic and time.sleep: sleeping advances the clock
+    instantly, so a whole crawl's schedule can be played out in milliseconds.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+class AdaptiveScheduler:
+    """
+    Paces sequential requests so a crawl finishes by a deadline while staying
+    inside a politeness envelope.
+
+    The delay before each request spreads the time left over the requests left,
+    so the crawl uses its whole budget rather than finishing early at full speed.
+    It is jittered downwards only, so jitter never pushes the crawl past the
+    deadline, and clamped to [min_delay, max_delay].
+
+    A 429 teaches the scheduler a floor: throttle_backoff times the delay that was
+    throttled, plus a pause for Retry-After. The floor decays slowly (floor_decay
+    per response) but never below the throttled delay, so the crawl does not creep
+    back into the rate limit. Server errors multiply a pressure factor on the
+    minimum delay by 1.5 and a recent latency above twice the long-run average by
+    1.25; successes let the pressure decay back to 1.
+    Politeness wins over the deadline: when the raised floor no longer fits, the
+    crawl runs late and a warning is logged.
+    """
+
+    def __init__(
+        self,
+        n_requests,
+        deadline,
+        min_delay=2.0,
+        max_delay=60.0,
+        jitter=0.25,
+        max_pressure=16.0,
+        smoothing=0.2,
+        throttle_backoff=1.5,
+        floor_decay=0.999,
+        clock=time.monotonic,
+        sleep=time.sleep,
+        rng=None,
+    ):
+        """
+        deadline is the number of seconds the whole crawl may take, e.g. from
+        calc_duration(). Pass a SimulatedClock as both clock and sleep=clock.sleep
+        to play a schedule out without waiting.
+        """
+        if min_delay < 0 or max_delay < min_delay:
+            raise ValueError("Delays must satisfy 0 <= min_delay <= max_delay.")
+        self.remaining = n_requests
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_pressure = max_pressure
+        self.smoothing = smoothing
+        self.throttle_backoff = throttle_backoff
+        self.floor_decay = floor_decay
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.deadline_at = clock() + deadline
+
+        self.pressure = 1.0
+        self.latency = 0.0
+        self.baseline_latency = 0.0
+        self.error_rate = 0.0
+        self.throttle_rate = 0.0
+        self.paused_until = 0.0
+        # The longest delay answered with a 429, and the floor learned from it
+        self.throttled_delay = 0.0
+        self.learned_floor = 0.0
+        self.last_delay = 0.0
+        self.observed = 0
+        self._warned = False
+
+    def _average(self, current, value):
+        return current + self.smoothing * (value - current)
+
+    def floor(self) -> float:
+        """The smallest delay the politeness envelope currently allows."""
+        return min(max(self.min_delay * self.pressure, self.learned_floor), self.max_delay)
+
+    def spread_delay(self) -> float:
+        """The delay per remaining request that would end the crawl exactly at the deadline."""
+        remaining = max(self.remaining, 1)
+        time_left = self.deadline_at - self.clock()
+        return (time_left - remaining * self.latency) / remaining
+
+    def on_track(self) -> bool:
+        """Whether the remaining requests fit before the deadline at the current floor."""
+        finish = self.clock() + self.remaining * (self.floor() + self.latency)
+        return finish <= self.deadline_at
+
+    def next_delay(self) -> float:
+        """The delay to leave before the next request."""
+        now = self.clock()
+        if self.observed == 0:
+            return max(0.0, self.paused_until - now)
+        spread = self.spread_delay()
+        floor = self.floor()
+        if spread < floor and not self._warned:
+            logging.warning(
+                f"Cannot finish {self.remaining} requests by the deadline at "
+                f"{floor:.1f}s between requests; the crawl will run late."
+            )
+            self._warned = True
+        delay = max(spread, 0.0) * self.rng.uniform(1 - self.jitter, 1)
+        delay = min(delay, self.max_delay)
+        return max(delay, floor, self.paused_until - now)
+
+    def wait(self) -> float:
+        """Sleep until the next request may be sent; returns the time slept."""
+        delay = self.last_delay = self.next_delay()
+        self.sleep(delay)
+        return delay
+
+    def observe(self, latency, status=None, retry_after=None):
+        """
+        Record a finished request. status is the HTTP status code, or None when the
+        request failed without a response; retry_after is a 429's Retry-After in seconds.
+        """
+        self.remaining -= 1
+        self.observed += 1
+        if self.observed == 1:
+            self.latency = self.baseline_latency = latency
+        else:
+            self.latency = self._average(self.latency, latency)
+            # A slower average, so a sustained slowdown stands out against it
+            self.baseline_latency += self.smoothing / 10 * (latency - self.baseline_latency)
+
+        throttled = status == 429
+        failed = status is None or status >= 500
+        self.throttle_rate = self._average(self.throttle_rate, float(throttled))
+        self.error_rate = self._average(self.error_rate, float(failed))
+
+        if throttled:
+            # The delay before this request was too short; the floor stays above it
+            trigger = max(self.last_delay, self.min_delay)
+            self.throttled_delay = max(self.throttled_delay, trigger)
+            self.learned_floor = max(self.learned_floor, self.throttle_backoff * trigger)
+            if retry_after:
+                self.paused_until = max(self.paused_until, self.clock() + retry_after)
+            return
+        self.learned_floor = max(self.learned_floor * self.floor_decay, self.throttled_delay)
+
+        if failed:
+            self.pressure *= 1.5
+        elif self.latency > 2 * self.baseline_latency:
+            self.pressure *= 1.25
+        else:
+            self.pressure *= 0.9
+        self.pressure = min(max(self.pressure, 1.0), self.max_pressure)
+
+    def skip(self):
+        """A request that was planned but will not be sent, e.g. an already saved page."""
+        self.remaining -= 1
+
+    def stats(self) -> dict:
+        return {
+            "remaining": self.remaining,
+            "pressure": self.pressure,
+            "learned_floor": self.learned_floor,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "throttle_rate": self.throttle_rate,
+            "on_track": self.on_track(),
+        }
+
+
+def simulated_server(latency=0.3, min_interval=None, retry_after=30, error_rate=0.0, rng=None):
+    """
+    A stand-in server for simulate(): every request takes about latency seconds,
+    fails with a 503 at error_rate, and gets a 429 with Retry-After when it arrives
+    less than min_interval seconds after the previous one.
+    """
+    rng = rng or random.Random()
+    last = [None]
+
+    def respond(now):
+        too_soon = min_interval is not None and last[0] is not None and now - last[0] < min_interval
+        last[0] = now
+        took = latency * rng.uniform(0.5, 1.5)
+        if too_soon:
+            return took, 429, retry_after
+        if rng.random() < error_rate:
+            return took, 503, None
+        return took, 200, None
+
+    return respond
+
+
+def simulate(scheduler, server, clock, n_requests=None) -> list:
+    """
+    Plays a schedule out against server on a SimulatedClock and returns its steps.
+    server(now) returns (latency, status, retry_after) for a request sent at now.
+    """
+    steps = []
+    n_requests = scheduler.remaining if n_requests is None else n_requests
+    for _ in range(n_requests):
+        delay = scheduler.wait()
+        sent_at = clock()
+        latency, status, retry_after = server(sent_at)
+        clock.sleep(latency)
+        scheduler.observe(latency, status, retry_after)
+        steps.append(ScheduleStep(sent_at, delay, latency, status))
+    return steps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play an adaptive crawl schedule out on a simulated clock."
+    )
+    parser.add_argument("--requests", type=int, default=180, help="Requests to schedule.")
+    parser.add_argument("--deadline", type=float, default=3600, help="Seconds the crawl may take.")
+    parser.add_argument("--min-delay", type=float, default=2.0, help="Smallest delay between requests.")
+    parser.add_argument("--max-delay", type=float, default=10.0, help="Largest delay between requests.")
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated response time.")
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=None,
+        help="Simulated server answers 429 to requests closer together than this.",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Simulated 503 rate.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    args = parser.parse_args()
+
+    clock = SimulatedClock()
+    scheduler = AdaptiveScheduler(
+        args.requests,
+        args.deadline,
+        args.min_delay,
+        args.max_delay,
+        clock=clock,
+        sleep=clock.sleep,
+        rng=random.Random(args.seed),
+    )
+    server = simulated_server(
+        args.latency, args.min_interval, error_rate=args.error_rate, rng=random.Random(args.seed + 1)
+    )
+    steps = simulate(scheduler, server, clock)
+    delays = [step.delay for step in steps[1:]] or [0.0]
+    statuses = [step.status for step in steps]
+    print(f"Finished {len(steps)} requests in {clock():.1f}s (deadline {args.deadline:.0f}s)")
+    print(f"Delay: min {min(delays):.2f}s, mean {sum(delays) / len(delays):.2f}s, max {max(delays):.2f}s")
+    print(f"429s: {statuses.count(429)}, 503s: {statuses.count(503)}")
@@ -0,0 +1,92 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+
+# Connect time accumulated by the connections opened on the current thread
+_connect_timing = threading.local()
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.seconds += time.perf_counter() - started
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.seconds += time.perf_counter() - started
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that records the time spent opening connections on each response."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        _connect_timing.seconds = 0.0
+        response = super().send(request, *args, **kwargs)
+        response.connect_time = _connect_timing.seconds
+        return response
+
+
+def create_session(pool_size=10, retries=3, backoff_factor=1.0, keep_alive=True):
+    """
+    Create a long-lived requests session for a whole crawl.
+
+    Up to pool_size connections are kept open and reused. Connection errors and 5xx
+    responses are retried with exponential backoff; 429s are left to the caller.
+    With keep_alive=False every request asks the server to close its connection.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        raise_on_status=False,
+        # Otherwise urllib3 retries any 429 carrying Retry-After on its own
+        respect_retry_after_header=False,
+    )
+    adapter = TimedHTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def timed_get(session, url, **kwargs):
+    """GET url and split the elapsed time into connect_time and transfer_time."""
+    started = time.perf_counter()
+    response = session.get(url, **kwargs)
+    elapsed = time.perf_counter() - started
+    response.connect_time = getattr(response, "connect_time", 0.0)
+    response.transfer_time = elapsed - response.connect_time
+    return response
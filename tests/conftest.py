@@ -0,0 +1,79 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+
+class StubServer:
+    """
+    Local HTTP server for scraper tests. routes maps a path to a list of
+    (status, headers, body) responses served in turn; the last one repeats.
+    Paths without a route get a 404.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.routes = {}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def route(self, path, *responses):
+        self.routes[path] = list(responses)
+
+    def page(self, path, body=None):
+        self.route(path, (200, {}, body or f"<html><body><h1>{path}</h1></body></html>"))
+
+    def _respond(self, handler):
+        with self._lock:
+            self.requests.append((handler.path, dict(handler.headers)))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            responses = self.routes.get(handler.path)
+            if responses:
+                status, headers, body = responses.pop(0) if len(responses) > 1 else responses[0]
+            else:
+                status, headers, body = 404, {}, "not found"
+        try:
+            time.sleep(self.delay)
+            data = body.encode("utf-8")
+            handler.send_response(status)
+            for name, value in headers.items():
+                handler.send_header(name, value)
+            handler.send_header("Content-Length", str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._respond(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
@@ -0,0 +1,26 @@
+from scraper.bunpro import scrape_sites, store_saver
+from scraper.page_store import PageStore
+from scraper.scheduler import AdaptiveScheduler
+
+
+def test_sites_already_in_the_page_store_are_skipped(stub_server, tmp_path):
+    saved_site = stub_server.url("/grammar_points/saved-point")
+    new_site = stub_server.url("/grammar_points/new-point")
+    stub_server.page("/grammar_points/saved-point")
+    stub_server.page("/grammar_points/new-point")
+    scheduler = AdaptiveScheduler(2, 1.0, min_delay=0, max_delay=0)
+
+    with PageStore(str(tmp_path / "pages.sqlite")) as store:
+        store.put("saved-point.html", b"<html></html>", url=saved_site)
+        results = list(
+            scrape_sites(
+                [saved_site, new_site],
+                scheduler,
+                save_page=store_saver(store),
+                store=store,
+            )
+        )
+        assert "new-point.html" in store
+
+    assert [result.site for result in results] == [new_site]
+    assert [path for path, _ in stub_server.requests] == ["/grammar_points/new-point"]
@@ -0,0 +1,57 @@
+import os
+import shutil
+import zipfile
+import pytest
+from dictionary_construction.create_dictionary import package_dictionary, write_term_banks
+from dictionary_construction.extraction import list_pages
+from dictionary_construction.pipeline import run_pipeline
+
+GRAMMAR_PAGES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "grammar_pages")
+# Sorts before the percent-encoded page names, so the build fails before any entry
+BROKEN_PAGE = "!broken.html"
+
+
+@pytest.fixture
+def pages_dir(tmp_path):
+    pages_dir = tmp_path / "grammar_pages"
+    pages_dir.mkdir()
+    for page in list_pages(GRAMMAR_PAGES)[:3]:
+        shutil.copy(os.path.join(GRAMMAR_PAGES, page), pages_dir / page)
+    return pages_dir
+
+
+def break_a_page(pages_dir):
+    (pages_dir / BROKEN_PAGE).write_text("<html><title>Broken</title></html>", encoding="utf-8")
+
+
+def test_failed_build_keeps_the_previous_zip(pages_dir, tmp_path):
+    zip_name = str(tmp_path / "bunpro_dict.zip")
+    run_pipeline(str(pages_dir), lambda records: package_dictionary(records, zip_name, max_entries=1))
+    with zipfile.ZipFile(zip_name) as zipf:
+        good = sorted(zipf.namelist())
+    assert "index.json" in good and "term_bank_3.json" in good
+
+    break_a_page(pages_dir)
+    with pytest.raises(Exception):
+        run_pipeline(str(pages_dir), lambda records: package_dictionary(records, zip_name, max_entries=1))
+    with zipfile.ZipFile(zip_name) as zipf:
+        assert sorted(zipf.namelist()) == good
+    assert sorted(os.listdir(tmp_path)) == ["bunpro_dict.zip", "grammar_pages"]
+
+
+def test_failed_build_keeps_the_previous_term_banks(pages_dir, tmp_path):
+    directory = tmp_path / "dictionary_files"
+    directory.mkdir()
+    (directory / "styles.css").write_text("", encoding="utf-8")
+    (directory / "term_bank_9.json").write_text("[]", encoding="utf-8")
+    run_pipeline(str(pages_dir), lambda records: write_term_banks(records, str(directory), 1))
+    good = {name: (directory / name).read_bytes() for name in os.listdir(directory)}
+    # The stale shard from an older, larger build is gone; other files are kept
+    assert "term_bank_9.json" not in good and "styles.css" in good
+    assert {"index.json", "tag_bank_1.json", "term_bank_3.json"} <= set(good)
+
+    break_a_page(pages_dir)
+    with pytest.raises(Exception):
+        run_pipeline(str(pages_dir), lambda records: write_term_banks(records, str(directory), 1))
+    assert {name: (directory / name).read_bytes() for name in os.listdir(directory)} == good
+    assert sorted(os.listdir(tmp_path)) == ["dictionary_files", "grammar_pages"]
@@ -0,0 +1,29 @@
+from dictionary_construction.const import JLPT
+from dictionary_construction.dictionary_metadata import DictionaryMetadata
+
+ENTRIES = [
+    ["あげる", "", "あげる", "v-unspec", 0, [], 1, "N4"],
+    ["ばかり", "", "ばかり", "prt", 0, [], 1, "N3"],
+    ["ばっかり", "", "ばっかり", "prt", 0, [], 1, "N3"],
+]
+
+
+def test_every_tag_row_is_referenced_by_a_term_tag():
+    metadata = DictionaryMetadata()
+    list(metadata.track(ENTRIES))
+    term_tags = {tag for entry in ENTRIES for tag in entry[JLPT].split()}
+
+    rows = metadata.tag_bank()
+    assert [row[0] for row in rows] == ["N4", "N3"]
+    assert {row[0] for row in rows} <= term_tags
+
+
+def test_frequency_rows_rank_by_jlpt_level():
+    metadata = DictionaryMetadata()
+    list(metadata.track(ENTRIES))
+    assert metadata.term_meta_bank() == [
+        ["あげる", "freq", {"value": 2, "displayValue": "N4"}],
+        ["ばかり", "freq", {"value": 3, "displayValue": "N3"}],
+        ["ばっかり", "freq", {"value": 3, "displayValue": "N3"}],
+    ]
+    assert metadata.entry_count == 3
@@ -0,0 +1,15 @@
+from dictionary_construction.extraction_cache import ExtractionCache, content_hash
+
+PAGE = "%E3%81%82%E3%81%92%E3%82%8B.html"
+RECORD = ["あげる", "", "あげる", "v-unspec", 0, [{"content": "x" * 1000}], 1, "N4"]
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    digest = content_hash("<html></html>")
+    with ExtractionCache(path) as cache:
+        cache.put(PAGE, digest, RECORD)
+    with ExtractionCache(path) as cache:
+        assert cache.get(PAGE, digest) == RECORD
+        assert cache.get(PAGE, content_hash("<html>edited</html>")) is None
+
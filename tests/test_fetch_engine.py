@@ -0,0 +1,94 @@
+import logging
+import time
+from scraper.fetch_engine import scrape_sites_concurrently
+
+
+def collect(sites, **kwargs):
+    saved = []
+    kwargs.setdefault("save_page", lambda response, site: saved.append(site))
+    results = list(scrape_sites_concurrently(sites, rate=100, burst=10, **kwargs))
+    return {result.site: result for result in results}, saved
+
+
+def test_requests_run_concurrently_up_to_the_limit(stub_server):
+    stub_server.delay = 0.2
+    sites = [stub_server.url(f"/grammar_points/p{i}") for i in range(6)]
+    for i in range(6):
+        stub_server.page(f"/grammar_points/p{i}")
+
+    results, saved = collect(sites, concurrency=3)
+
+    assert sorted(saved) == sorted(sites)
+    assert all(result.action == "scrape" for result in results.values())
+    assert 1 < stub_server.max_in_flight <= 3
+
+
+def test_429_pauses_and_retries_after_retry_after(stub_server):
+    site = stub_server.url("/grammar_points/limited")
+    stub_server.route(
+        "/grammar_points/limited",
+        (429, {"Retry-After": "1"}, "slow down"),
+        (200, {}, "<html></html>"),
+    )
+
+    started = time.perf_counter()
+    results, saved = collect([site], concurrency=1)
+
+    assert results[site].action == "scrape"
+    assert saved == [site]
+    assert len(stub_server.requests) == 2
+    assert time.perf_counter() - started >= 1
+    assert results[site].sleep_time >= 0.9
+
+
+def test_404_is_reported_as_an_error(stub_server):
+    missing = stub_server.url("/grammar_points/missing")
+
+    results, saved = collect([missing], concurrency=1)
+
+    assert results[missing].action == "error"
+    assert saved == []
+
+
+def test_save_page_errors_are_reported_per_site(stub_server, caplog):
+    sites = [stub_server.url(f"/grammar_points/p{i}") for i in range(3)]
+    for i in range(3):
+        stub_server.page(f"/grammar_points/p{i}")
+
+    def boom(response, site):
+        raise OSError("disk full")
+
+    with caplog.at_level(logging.ERROR):
+        results, _ = collect(sites, concurrency=2, save_page=boom)
+
+    assert sorted(results) == sorted(sites)
+    assert all(result.action == "error" for result in results.values())
+    assert "disk full" in caplog.text
+
+
+def test_errors_from_the_sites_iterable_are_raised(stub_server):
+    def sites():
+        yield stub_server.url("/grammar_points/missing")
+        raise RuntimeError("frontier failed")
+
+    try:
+        collect(sites(), concurrency=1)
+    except RuntimeError as e:
+        assert str(e) == "frontier failed"
+    else:
+        raise AssertionError("the iterable's error was swallowed")
+
+
+def test_exhausted_retries_end_the_crawl(stub_server):
+    limited = stub_server.url("/grammar_points/limited")
+    stub_server.route("/grammar_points/limited", (429, {"Retry-After": "0"}, "slow down"))
+    later = [stub_server.url(f"/grammar_points/p{i}") for i in range(3)]
+    for i in range(3):
+        stub_server.page(f"/grammar_points/p{i}")
+
+    results, saved = collect([limited] + later, concurrency=1, max_retries=1)
+
+    assert list(results) == [limited]
+    assert results[limited].action == "break"
+    assert saved == []
+    assert [path for path, _ in stub_server.requests] == ["/grammar_points/limited"] * 2
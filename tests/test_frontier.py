@@ -0,0 +1,70 @@
+import os
+from scraper.frontier import CrawlFrontier, crawl
+
+
+def run(stub_server, tmp_path, paths, **kwargs):
+    sites = [("N5", stub_server.url(path)) for path in paths]
+    kwargs.setdefault("concurrency", 1)
+    return crawl(
+        sites,
+        journal_path=str(tmp_path / "frontier_journal.jsonl"),
+        pages_dir=str(tmp_path / "grammar_pages"),
+        rate=100,
+        burst=10,
+        **kwargs,
+    )
+
+
+def test_frontier_serves_unfetched_sites_first_then_the_stalest():
+    fetched = {"old": 100.0, "older": 50.0}
+    frontier = CrawlFrontier(lambda site: fetched.get(site))
+    frontier.add_all(["old", "new", "older", "new"])
+    frontier.close()
+
+    assert list(frontier) == ["new", "older", "old"]
+
+
+def test_a_second_run_fetches_again_and_overwrites_the_pages(stub_server, tmp_path):
+    paths = ["/grammar_points/p1", "/grammar_points/p2"]
+    for path in paths:
+        stub_server.route(
+            path,
+            (200, {}, "<html><body>old</body></html>"),
+            (200, {}, "<html><body>new</body></html>"),
+        )
+
+    for _ in range(2):
+        results = run(stub_server, tmp_path, paths)
+        assert [result.action for result in results] == ["scrape", "scrape"]
+        assert not (tmp_path / "frontier_journal.jsonl").exists()
+
+    pages_dir = tmp_path / "grammar_pages"
+    assert sorted(os.listdir(pages_dir)) == ["p1.html", "p2.html"]
+    assert "new" in (pages_dir / "p1.html").read_text(encoding="utf-8")
+    assert len(stub_server.requests) == 4
+
+
+def test_recently_saved_pages_are_skipped_with_min_age(stub_server, tmp_path):
+    paths = ["/grammar_points/p1"]
+    stub_server.page(paths[0])
+
+    run(stub_server, tmp_path, paths)
+    assert run(stub_server, tmp_path, paths, min_age=3600) == []
+    assert len(stub_server.requests) == 1
+
+
+def test_a_run_cut_short_resumes_without_refetching_completed_sites(stub_server, tmp_path):
+    paths = ["/grammar_points/p1", "/grammar_points/p2"]
+    stub_server.page(paths[0])
+    stub_server.route(paths[1], (429, {"Retry-After": "0"}, "slow down"))
+
+    first = run(stub_server, tmp_path, paths, max_retries=0)
+    assert [result.action for result in first] == ["scrape", "break"]
+    assert (tmp_path / "frontier_journal.jsonl").exists()
+
+    stub_server.page(paths[1])
+    second = run(stub_server, tmp_path, paths)
+
+    assert [result.site for result in second] == [stub_server.url(paths[1])]
+    assert [path for path, _ in stub_server.requests].count(paths[0]) == 1
+    assert not (tmp_path / "frontier_journal.jsonl").exists()
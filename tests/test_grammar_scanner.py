@@ -0,0 +1,86 @@
+import json
+from dictionary_construction.grammar_scanner import (
+    GrammarMatch,
+    GrammarScanner,
+    scan_parallel,
+    surface_fragments,
+)
+
+GRAMMAR_POINTS = [
+    ("たとえ〜ても", "N3"),
+    ("ても", "N4"),
+    ("ば", "N4"),
+    ("ばかり・ばっかり", "N3"),
+    ("かり", "N1"),
+]
+SENTENCES = [
+    "たとえ雨が降っても行く",
+    "ても雨がたとえ",
+    "肉ばっかり食べる",
+    "何もない",
+    "ばかりだ",
+]
+
+
+def test_surface_fragments_drop_decoration_and_split_on_placeholders():
+    assert surface_fragments("たとえ〜ても") == ("たとえ", "ても")
+    assert surface_fragments("(お)〜ください") == ("お", "ください")
+    assert surface_fragments("〜ばかり") == ("ばかり",)
+
+
+def test_every_occurrence_is_found_including_overlaps():
+    scanner = GrammarScanner(GRAMMAR_POINTS)
+
+    assert scanner.find_all("肉ばっかり食べる") == [
+        GrammarMatch(1, 2, "ば", "N4"),
+        GrammarMatch(1, 5, "ばかり・ばっかり", "N3"),
+        GrammarMatch(3, 5, "かり", "N1"),
+    ]
+    assert scanner.find_all("何もない") == []
+
+
+def test_gapped_forms_need_their_fragments_in_order():
+    scanner = GrammarScanner(GRAMMAR_POINTS)
+
+    assert scanner.find_all("たとえ雨が降っても行く") == [
+        GrammarMatch(0, 9, "たとえ〜ても", "N3"),
+        GrammarMatch(7, 9, "ても", "N4"),
+    ]
+    assert scanner.find_all("ても雨がたとえ") == [GrammarMatch(0, 2, "ても", "N4")]
+
+
+def test_longest_matches_are_leftmost_longest_and_do_not_overlap():
+    scanner = GrammarScanner(GRAMMAR_POINTS)
+
+    assert scanner.longest_matches("たとえ雨が降っても行く") == [
+        GrammarMatch(0, 9, "たとえ〜ても", "N3"),
+    ]
+    assert scanner.longest_matches("肉ばっかり食べる") == [
+        GrammarMatch(1, 5, "ばかり・ばっかり", "N3"),
+    ]
+    # Resumes after the selected match, so a later point is still found
+    assert scanner.longest_matches("ばてもば") == [
+        GrammarMatch(0, 1, "ば", "N4"),
+        GrammarMatch(1, 3, "ても", "N4"),
+        GrammarMatch(3, 4, "ば", "N4"),
+    ]
+
+
+def test_min_length_ignores_short_forms():
+    scanner = GrammarScanner(GRAMMAR_POINTS, min_length=2)
+
+    assert [match.subject for match in scanner.find_all("ばかりだ")] == [
+        "ばかり・ばっかり",
+        "かり",
+    ]
+
+
+def test_scan_parallel_yields_results_in_input_order(tmp_path):
+    bank = [[subject, "", subject, "", 10, [], 1, jlpt] for subject, jlpt in GRAMMAR_POINTS]
+    (tmp_path / "term_bank_1.json").write_text(json.dumps(bank, ensure_ascii=False), encoding="utf-8")
+    sentences = SENTENCES * 3
+    expected = list(GrammarScanner(GRAMMAR_POINTS).scan(sentences, longest=True))
+
+    results = list(scan_parallel(str(tmp_path), sentences, workers=2, batch_size=2, longest=True))
+
+    assert results == expected
@@ -0,0 +1,11 @@
+import os
+import pytest
+from benchmarks import import_budget
+
+
+@pytest.mark.skipif(
+    not os.environ.get("BUNPRO_IMPORT_BUDGET"),
+    reason="set BUNPRO_IMPORT_BUDGET=1 to time module imports against their budgets",
+)
+def test_modules_import_within_budget():
+    assert import_budget.main() == []
@@ -0,0 +1,56 @@
+import json
+import pandas as pd
+import pytest
+from dictionary_construction.intermediate import read_columns, read_entries, write_entries
+from dictionary_construction.json_generator import benchmark, compose_entries, compose_entry
+
+ROWS = [
+    {
+        "subject": "あげる",
+        "reading": "あげる",
+        "part_of_speech": "v-unspec",
+        "definition": "To give",
+        "explanation": "Used when giving something to someone else. " * 10,
+        "link": "https://bunpro.jp/grammar_points/あげる",
+        "JLPT": "N4",
+        "example_sentences": ["これをあげる。", "花をあげた。"],
+    },
+    # Two "・" variants sharing one glossary, without a part of speech
+    {
+        "subject": "ばかり",
+        "reading": "",
+        "part_of_speech": "",
+        "definition": "Just, only",
+        "explanation": "Shared explanation.",
+        "link": "https://bunpro.jp/grammar_points/ばかり",
+        "JLPT": "N3",
+        "example_sentences": ["遊んでばかりいる。"],
+    },
+    {
+        "subject": "ばっかり",
+        "reading": "",
+        "part_of_speech": "",
+        "definition": "Just, only",
+        "explanation": "Shared explanation.",
+        "link": "https://bunpro.jp/grammar_points/ばかり",
+        "JLPT": "N3",
+        "example_sentences": ["遊んでばっかりいる。"],
+    },
+]
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet", ".arrow"])
+def test_batch_composer_matches_per_row_reference(tmp_path, suffix):
+    path = str(tmp_path / f"bunpro_entries{suffix}")
+    write_entries(pd.DataFrame(ROWS), path)
+
+    reference = (
+        read_entries(path)
+        .apply(lambda row: compose_entry(**{"term_long_name": "", **row}), axis=1)
+        .tolist()
+    )
+    batch = compose_entries(read_columns(path))
+
+    assert json.dumps(batch, ensure_ascii=False) == json.dumps(reference, ensure_ascii=False)
+    assert [entry[3] for entry in batch] == ["v-unspec", "", ""]
+    benchmark(path, repeat=1)
@@ -0,0 +1,34 @@
+import os
+import pytest
+
+pytest.importorskip("lxml")
+
+from dictionary_construction.extraction import list_pages
+from dictionary_construction.lxml_entry import compare_backends
+
+GRAMMAR_PAGES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "grammar_pages")
+# Pages compared on every run; the full corpus takes about a minute with bs4
+SAMPLE_SIZE = 40
+
+
+def sample_pages(n=SAMPLE_SIZE) -> list:
+    """Evenly spaced pages plus the largest one, the same on every run."""
+    pages = list_pages(GRAMMAR_PAGES)
+    step = max(len(pages) // n, 1)
+    sample = pages[::step][:n]
+    largest = max(pages, key=lambda page: os.path.getsize(os.path.join(GRAMMAR_PAGES, page)))
+    if largest not in sample:
+        sample.append(largest)
+    return sample
+
+
+def test_lxml_matches_bs4_on_sample_pages():
+    assert compare_backends(GRAMMAR_PAGES, sample_pages()) == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get("BUNPRO_FULL_CORPUS"),
+    reason="set BUNPRO_FULL_CORPUS=1 to compare every saved page",
+)
+def test_lxml_matches_bs4_on_every_page():
+    assert compare_backends(GRAMMAR_PAGES) == []
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+import pytest
+from dictionary_construction import pipeline
+from dictionary_construction.extraction import extract_record, list_pages, read_page
+from dictionary_construction.extraction_cache import ExtractionCache
+from dictionary_construction.pipeline import run_pipeline
+
+GRAMMAR_PAGES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "grammar_pages")
+PAGES = list_pages(GRAMMAR_PAGES)[:6]
+BROKEN_HTML = "<html><title>Broken</title></html>"
+
+
+class MemoryStore:
+    """
+    PageStore stand-in serving pages from a dict and counting reads. Reading a page
+    in failing raises instead.
+    """
+
+    def __init__(self, pages, failing=()):
+        self.pages = pages
+        self.failing = set(failing)
+        self.reads = 0
+        self._lock = threading.Lock()
+
+    def names(self) -> list:
+        return sorted(self.pages)
+
+    def read_text(self, name) -> str:
+        with self._lock:
+            self.reads += 1
+        if name in self.failing:
+            raise OSError(f"cannot read {name}")
+        return self.pages[name]
+
+
+@pytest.fixture
+def store():
+    return MemoryStore({page: read_page(GRAMMAR_PAGES, page) for page in PAGES})
+
+
+def expected_records(store):
+    return [extract_record(store.pages[page]) for page in store.names()]
+
+
+def collect(source, **kwargs):
+    records = []
+    run_pipeline(source, records.extend, **kwargs)
+    return records
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_records_arrive_in_page_order(store, workers):
+    assert collect(store, workers=workers, max_pending=2) == expected_records(store)
+
+
+def test_bounded_queues_hold_the_reader_back(store):
+    html = store.pages[PAGES[0]]
+    store = MemoryStore({f"{i:03d}.html": html for i in range(40)})
+    reads_after_first_record = []
+
+    def consume(records):
+        for i, _ in enumerate(records):
+            if i == 0:
+                # Give the reader time to run ahead if nothing holds it back
+                time.sleep(0.3)
+                reads_after_first_record.append(store.reads)
+
+    run_pipeline(store, consume, prefetch=1, write_buffer=1)
+
+    # At most one page per queue slot and stage is in flight behind the writer
+    assert reads_after_first_record[0] <= 6
+    assert store.reads == 40
+
+
+def test_reader_errors_are_raised(store):
+    store.failing.add(PAGES[2])
+
+    with pytest.raises(OSError, match="cannot read"):
+        collect(store)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parser_errors_are_raised(store, workers):
+    store.pages["!broken.html"] = BROKEN_HTML
+
+    with pytest.raises(AttributeError):
+        collect(store, workers=workers)
+
+
+def test_writer_errors_stop_the_other_stages(store):
+    def consume(records):
+        next(records)
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        run_pipeline(store, consume, prefetch=1, write_buffer=1)
+    # The reader stopped early instead of reading every page
+    assert store.reads < len(PAGES)
+    assert not any(thread.name == "page-reader" for thread in threading.enumerate())
+
+
+def test_cached_records_skip_parsing(store, tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    with ExtractionCache(path) as cache:
+        first = collect(store, cache=cache)
+
+    def fail(html, backend="bs4"):
+        raise AssertionError("a cached page was parsed again")
+
+    monkeypatch.setattr(pipeline, "extract_record", fail)
+    with ExtractionCache(path) as cache:
+        assert collect(store, cache=cache) == first == expected_records(store)
+
+    # An edited page misses the cache and is parsed
+    store.pages[PAGES[0]] += "<!-- edited -->"
+    with ExtractionCache(path) as cache, pytest.raises(AssertionError, match="parsed again"):
+        collect(store, cache=cache)
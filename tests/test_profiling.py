@@ -0,0 +1,41 @@
+import os
+import pytest
+from dictionary_construction.create_dictionary import EXTRACT_METHODS, profile_record
+from dictionary_construction.extraction import (
+    extract_record,
+    list_pages,
+    parse_entry,
+    read_page,
+)
+from dictionary_construction.lxml_entry import lxml
+from dictionary_construction.profiling import BuildProfiler
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "grammar_pages")
+SAMPLE_PAGE = "%E3%81%82%E3%81%92%E3%82%8B.html"
+BACKENDS = ["bs4", pytest.param("lxml", marks=pytest.mark.skipif(lxml is None, reason="lxml"))]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_parse_only_entry_populates_on_demand(backend):
+    html = read_page(PAGES_DIR, SAMPLE_PAGE)
+    entry = parse_entry(html, backend, populate=False)
+    assert entry.title
+    assert not hasattr(entry, "subject")
+    entry.populate()
+    assert entry.to_record() == parse_entry(html, backend).to_record()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_profile_record_times_every_stage_per_page(backend):
+    pages = list_pages(PAGES_DIR)[:3]
+    with BuildProfiler(trace_memory=True) as profiler:
+        for page in pages:
+            html = read_page(PAGES_DIR, page)
+            assert profile_record(page, html, profiler, backend) == extract_record(html, backend)
+
+    assert set(profiler.pages) == set(pages)
+    for totals in profiler.pages.values():
+        assert set(totals["stages"]) == {"parse", *EXTRACT_METHODS, "generate_entry"}
+        assert totals["peak_bytes"] > 0
+        assert "net_bytes" in totals
+    assert all("peak_bytes" in totals for totals in profiler.slowest_pages())
@@ -0,0 +1,102 @@
+import os
+import shutil
+from dictionary_construction import dataframe_generator
+from scraper.refresh import INDEX_FILENAME, refresh_sites
+
+REPO = os.path.dirname(os.path.dirname(__file__))
+SAMPLE_PAGE = "%E3%81%82%E3%81%92%E3%82%8B.html"
+
+
+def refresh(stub_server, pages_dir, sites, saved):
+    return list(
+        refresh_sites(
+            sites,
+            pages_dir=str(pages_dir),
+            min_interval=0,
+            save_page=lambda response, site: saved.append(site),
+        )
+    )
+
+
+def test_unchanged_pages_are_not_saved_again(stub_server, tmp_path):
+    pages_dir = tmp_path / "grammar_pages"
+    site = stub_server.url("/grammar_points/p1")
+    stub_server.route(
+        "/grammar_points/p1",
+        (200, {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}, "<html></html>"),
+        (304, {}, ""),
+    )
+    saved = []
+
+    first = refresh(stub_server, pages_dir, [site], saved)
+    second = refresh(stub_server, pages_dir, [site], saved)
+
+    assert [result.action for result in first] == ["scrape"]
+    assert [result.action for result in second] == ["not_modified"]
+    assert saved == [site]
+    _, headers = stub_server.requests[1]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+def test_changed_pages_are_saved_and_their_validators_updated(stub_server, tmp_path):
+    pages_dir = tmp_path / "grammar_pages"
+    site = stub_server.url("/grammar_points/p1")
+    stub_server.route(
+        "/grammar_points/p1",
+        (200, {"ETag": '"v1"'}, "<html>old</html>"),
+        (200, {"ETag": '"v2"'}, "<html>new</html>"),
+        (304, {}, ""),
+    )
+    saved = []
+
+    for _ in range(3):
+        refresh(stub_server, pages_dir, [site], saved)
+
+    assert saved == [site, site]
+    assert [headers.get("If-None-Match") for _, headers in stub_server.requests] == [
+        None,
+        '"v1"',
+        '"v2"',
+    ]
+
+
+def test_index_is_kept_outside_the_pages_directory(stub_server, tmp_path):
+    pages_dir = tmp_path / "grammar_pages"
+    site = stub_server.url("/grammar_points/p1")
+    stub_server.route("/grammar_points/p1", (200, {"ETag": '"v1"'}, "<html></html>"))
+    pages_dir.mkdir()
+    shutil.copy(os.path.join(REPO, "grammar_pages", SAMPLE_PAGE), pages_dir / SAMPLE_PAGE)
+
+    refresh(stub_server, pages_dir, [site], [])
+
+    assert os.listdir(pages_dir) == [SAMPLE_PAGE]
+    assert (tmp_path / INDEX_FILENAME).exists()
+
+
+def test_dataframe_generator_ignores_files_that_are_not_pages(tmp_path):
+    pages_dir = tmp_path / "grammar_pages"
+    pages_dir.mkdir()
+    shutil.copy(os.path.join(REPO, "grammar_pages", SAMPLE_PAGE), pages_dir / SAMPLE_PAGE)
+    (pages_dir / INDEX_FILENAME).write_text("{}", encoding="utf-8")
+    output = tmp_path / "bunpro_entries.csv"
+
+    dataframe_generator.main(output=str(output), pages_dir=str(pages_dir))
+
+    assert output.read_text(encoding="utf-8").count("\n") >= 2
+
+
+def test_changed_pages_overwrite_the_page_in_pages_dir(stub_server, tmp_path):
+    pages_dir = tmp_path / "grammar_pages"
+    site = stub_server.url("/grammar_points/p1")
+    stub_server.route(
+        "/grammar_points/p1",
+        (200, {"ETag": '"v1"'}, "<html><body>old</body></html>"),
+        (200, {"ETag": '"v2"'}, "<html><body>new</body></html>"),
+    )
+
+    for _ in range(2):
+        list(refresh_sites([site], pages_dir=str(pages_dir), min_interval=0))
+
+    assert os.listdir(pages_dir) == ["p1.html"]
+    assert "new" in (pages_dir / "p1.html").read_text(encoding="utf-8")
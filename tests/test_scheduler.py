@@ -0,0 +1,53 @@
+import random
+import pytest
+from scraper.scheduler import AdaptiveScheduler, SimulatedClock, simulate, simulated_server
+
+
+def simulated_scheduler(n_requests, deadline, min_delay=2.0, max_delay=10.0, seed=0, **kwargs):
+    clock = SimulatedClock()
+    scheduler = AdaptiveScheduler(
+        n_requests,
+        deadline,
+        min_delay,
+        max_delay,
+        clock=clock,
+        sleep=clock.sleep,
+        rng=random.Random(seed),
+        **kwargs,
+    )
+    return scheduler, clock
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_jitter_never_overshoots_the_deadline(seed):
+    scheduler, clock = simulated_scheduler(5, 100, max_delay=60, seed=seed)
+    simulate(scheduler, simulated_server(rng=random.Random(seed + 1)), clock)
+    assert clock() <= 100
+    assert clock() > 90
+
+
+def test_rate_limit_is_learned_instead_of_retried():
+    scheduler, clock = simulated_scheduler(180, 600)
+    server = simulated_server(min_interval=3, rng=random.Random(1))
+    steps = simulate(scheduler, server, clock)
+
+    statuses = [step.status for step in steps]
+    assert statuses.count(429) <= 2
+    throttled_at = statuses.index(429)
+    # Every later delay stays above the one that was throttled
+    assert min(step.delay for step in steps[throttled_at + 1 :]) > steps[throttled_at].delay
+
+
+def test_learned_floor_decays_but_not_below_the_throttled_delay():
+    scheduler, clock = simulated_scheduler(1000, 10_000, seed=3)
+    scheduler.observe(0.3, 200)
+    scheduler.wait()
+    throttled_delay = scheduler.last_delay
+    scheduler.observe(0.3, 429, retry_after=30)
+
+    assert scheduler.next_delay() == pytest.approx(30)
+    assert scheduler.learned_floor == pytest.approx(1.5 * throttled_delay)
+    for _ in range(2000):
+        scheduler.observe(0.3, 200)
+    assert scheduler.learned_floor == pytest.approx(throttled_delay)
+    assert scheduler.floor() >= throttled_delay
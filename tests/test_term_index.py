@@ -0,0 +1,93 @@
+import json
+import zipfile
+import pytest
+from dictionary_construction.term_index import TermIndex, build_index
+
+GLOSSARY = [{"type": "structured-content", "content": ["x"]}]
+BANKS = [
+    [
+        ["あげる", "", "あげる", "v-unspec", 10, GLOSSARY, 1, "N4"],
+        ["ばかり", "", "ばかり", "prt", 10, GLOSSARY, 1, "N3"],
+        ["ばっかり", "", "ばかり", "prt", 10, GLOSSARY, 1, "N3"],
+    ],
+    [
+        ["あまり・あんまり", "", "あまり", "adv", 10, GLOSSARY, 1, "N4"],
+        ["だけ", "", "だけ", "prt exp", 10, GLOSSARY, 1, "N5"],
+    ],
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    for n, bank in enumerate(BANKS, start=1):
+        (tmp_path / f"term_bank_{n}.json").write_text(
+            json.dumps(bank, ensure_ascii=False), encoding="utf-8"
+        )
+    path = str(tmp_path / "term_index.bin")
+    assert build_index(str(tmp_path), path) == 4
+    with TermIndex(path) as index:
+        yield index
+
+
+def subjects(entries):
+    return sorted(entry[0] for entry in entries)
+
+
+def test_exact_lookups(index):
+    assert index.lookup("あげる") == [BANKS[0][0]]
+    assert index.lookup("ありません") == []
+    assert "だけ" in index
+    assert "だ" not in index
+    assert len(index) == 4
+
+
+def test_variants_share_one_body_and_keep_the_matched_subject(index):
+    # ばかり and ばっかり differ only in subject, so they are stored once
+    assert index.lookup("ばっかり") == [BANKS[0][2]]
+    assert index.lookup("ばかり") == [BANKS[0][1]]
+    # A "・" subject is found under the full subject and under each variant
+    for subject in ["あまり・あんまり", "あまり", "あんまり"]:
+        [entry] = index.lookup(subject)
+        assert entry[0] == subject
+        assert entry[1:] == BANKS[1][0][1:]
+
+
+def test_prefix_lookups_are_in_key_order(index):
+    assert [entry[0] for entry in index.prefix("あ")] == [
+        "あげる",
+        "あまり",
+        "あまり・あんまり",
+        "あんまり",
+    ]
+    assert len(index.prefix("あ", limit=2)) == 2
+    assert index.prefix("ん") == []
+
+
+def test_jlpt_and_pos_lookups(index):
+    assert subjects(index.by_jlpt("N4")) == ["あげる", "あまり・あんまり"]
+    assert subjects(index.by_jlpt("N3")) == ["ばかり"]
+    assert index.by_jlpt("N1") == []
+    # Space-separated parts of speech are indexed separately
+    assert subjects(index.by_pos("prt")) == ["だけ", "ばかり"]
+    assert subjects(index.by_pos("exp")) == ["だけ"]
+
+
+def test_index_builds_from_a_dictionary_zip(tmp_path):
+    source = tmp_path / "bunpro_dict.zip"
+    with zipfile.ZipFile(source, "w") as zipf:
+        zipf.writestr("index.json", "{}")
+        for n, bank in enumerate(BANKS, start=1):
+            zipf.writestr(f"term_bank_{n}.json", json.dumps(bank, ensure_ascii=False))
+    path = str(tmp_path / "term_index.bin")
+
+    assert build_index(str(source), path) == 4
+    with TermIndex(path) as index:
+        assert index.lookup("だけ") == [BANKS[1][1]]
+
+
+def test_files_that_are_not_an_index_are_rejected(tmp_path):
+    path = tmp_path / "term_index.bin"
+    path.write_bytes(b"NOPE" + bytes(60))
+
+    with pytest.raises(ValueError, match="not a version 1 term index"):
+        TermIndex(str(path))